@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+基准测试用例：每个用例是一个接收单条文本的函数，以及它需要跑的语料
+"""
+
+from functools import partial
+
+from nlpyutil import ch_utils
+from nlpyutil import preprocess
+from nlpyutil import usual_pattern
+
+
+class BenchmarkCase(object):
+    '''
+    一个基准测试用例
+    '''
+
+    def __init__(self, name, func, corpora=None):
+        '''
+        :param name: 用例名
+        :param func: 被测函数，参数为单条文本
+        :param corpora: 需要运行的语料名，None表示所有语料
+        '''
+        self.name = name
+        self.func = func
+        self.corpora = corpora
+
+    def runs_on(self, corpus):
+        return self.corpora is None or corpus in self.corpora
+
+
+def default_cases():
+    """
+    所有 preprocess_* 函数，全角半角转换和 usual_pattern 中的抽取函数
+    :return:
+    """
+    cases = []
+    for name in sorted(dir(preprocess)):
+        func = getattr(preprocess, name)
+        if name.startswith('preprocess_') and callable(func):
+            cases.append(BenchmarkCase(name, func))
+    cases.append(BenchmarkCase('preprocess_remove_duplacte_words_bounded',
+                               partial(preprocess.preprocess_remove_duplacte_words,
+                                       max_unit_len=preprocess.DUPLICATE_UNIT_MAX_LEN)))
+    cases.append(BenchmarkCase('str_to_dbc', ch_utils.str_to_dbc))
+    cases.append(BenchmarkCase('str_to_sbc', ch_utils.str_to_sbc))
+    for name in ('extract_emails', 'extract_urls', 'extract_phones', 'extract_entities', 'mask_entities'):
+        cases.append(BenchmarkCase(name, getattr(usual_pattern, name)))
+    cases.append(BenchmarkCase('chained_cleanup', _chained_cleanup))
+    cases.append(BenchmarkCase('single_pass_cleanup', _single_pass_cleanup))
+    return cases
+
+
+def _chained_cleanup(text):
+    text = preprocess.preprocess_remove_links(text)
+    text = preprocess.preprocess_remove_html_marks(text)
+    text = preprocess.preprocess_replace_whitespace(text)
+    return preprocess.preprocess_strip_blanks(text)
+
+
+def _single_pass_cleanup(text):
+    """
+    和 _chained_cleanup 的结果相同
+    """
+    return preprocess.preprocess_clean_text(text, repl='')
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+可复现的合成语料，用于基准测试。相同的 seed 和 size 总是生成相同的语料
+"""
+
+import random
+import string
+
+# 常用汉字，包含部分繁体字
+_HANZI = ('的一是不了在人有我他这个们中来上大为和国地到以说时要就出会可也你对生能而子那得于着下自之年过发后作里用道行所然家种事成方多经么去法学如'
+          '都同现当没动面起看定天分还进好小部其些主样理心她本前开但因只从想实日军者意无力它与长把机十民第公此已工使情明性知全三又关点正业外将两高间由问'
+          '很最重并物手应战向头文体政美相见被利什二等产或新己制身果加西斯月话合回特代内信表化老给世位次度门任常先海通教儿原东声提立及比员解水名真论处走义'
+          '臺灣東亞側島嶼國際經濟發展時間學習電腦網絡語言應該這個們關係實際問題')
+_PUNCTUATION = '，。！？、；：“”（）《》…—'
+_WORDS = ['python', 'NLP', 'the', 'model', 'data', 'is', 'great', 'GPU', 'learning', 'token', 'Beijing', 'iPhone']
+_FULL_WIDTH = 'ＡＢＣａｂｃ１２３！？　'
+_SYMBOLS = '★☆♥♪→←█▄▇▆▅▃😀😂👍'
+_USERS = ['小明', 'weibo_user', '新闻速递', 'Tom_123', '每日一笑', '数据分析师']
+
+
+def _hanzi(rng, length):
+    return ''.join(rng.choice(_HANZI) for _ in range(length))
+
+
+def _sentence(rng, min_len=8, max_len=30):
+    return _hanzi(rng, rng.randint(min_len, max_len)) + rng.choice(_PUNCTUATION)
+
+
+def _url(rng):
+    return 'http://t.cn/' + ''.join(rng.choice(string.ascii_letters + string.digits) for _ in range(7))
+
+
+def weibo_posts(size, seed=0):
+    """
+    短微博文本：话题，@用户，链接，转发链，表情符号和"...全文"
+    :param size: 生成的条数
+    :param seed:
+    :return:
+    """
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(size):
+        parts = []
+        if rng.random() < 0.3:
+            parts.append('#{}#'.format(_hanzi(rng, rng.randint(2, 8))))
+        parts.append(_sentence(rng))
+        if rng.random() < 0.5:
+            parts.append(rng.choice(_SYMBOLS) * rng.randint(1, 3))
+        if rng.random() < 0.4:
+            parts.append(_url(rng))
+        for _ in range(rng.randint(0, 3)):
+            parts.append('//@{}:{}'.format(rng.choice(_USERS), _sentence(rng, 2, 12)))
+        if rng.random() < 0.2:
+            parts.append('...全文')
+        posts.append(' '.join(parts) if rng.random() < 0.3 else ''.join(parts))
+    return posts
+
+
+def mixed_articles(size, seed=0, paragraphs=20):
+    """
+    中英文混排的长文章，包含全角字符，数字，邮箱和链接
+    :param size: 生成的篇数
+    :param seed:
+    :param paragraphs: 每篇的段落数
+    :return:
+    """
+    rng = random.Random(seed)
+    articles = []
+    for _ in range(size):
+        lines = []
+        for _ in range(paragraphs):
+            items = []
+            for _ in range(rng.randint(3, 8)):
+                roll = rng.random()
+                if roll < 0.6:
+                    items.append(_sentence(rng))
+                elif roll < 0.8:
+                    items.append(' '.join(rng.choice(_WORDS) for _ in range(rng.randint(2, 8))) + '. ')
+                elif roll < 0.9:
+                    items.append(''.join(rng.choice(_FULL_WIDTH) for _ in range(rng.randint(2, 6))))
+                elif roll < 0.95:
+                    items.append('{}@example.com '.format(rng.choice(_WORDS).lower()))
+                else:
+                    items.append('https://www.example.com/{}?id={} '.format(rng.choice(_WORDS).lower(),
+                                                                          rng.randint(1, 10000)))
+            lines.append(''.join(items))
+        articles.append('\n'.join(lines))
+    return articles
+
+
+def html_pages(size, seed=0, blocks=30):
+    """
+    html页面，正文分散在各种标签中
+    :param size: 生成的页数
+    :param seed:
+    :param blocks: 每页的块数
+    :return:
+    """
+    rng = random.Random(seed)
+    tags = ['p', 'div', 'span', 'li', 'h2', 'td']
+    pages = []
+    for _ in range(size):
+        body = []
+        for _ in range(blocks):
+            tag = rng.choice(tags)
+            body.append('<{0} class="c{1}" id="x{2}">{3}<a href="{4}">{5}</a></{0}>\n'.format(
+                tag, rng.randint(0, 9), rng.randint(0, 999), _sentence(rng), _url(rng), _hanzi(rng, 4)))
+        pages.append('<html><head><title>{}</title></head><body>\n{}</body></html>'.format(_hanzi(rng, 10),
+                                                                                           ''.join(body)))
+    return pages
+
+
+def repeated_chars(size, seed=0, length=300):
+    """
+    病态输入：大量重复的字符，词和标点，以及超长的空白和点分隔串
+    :param size: 生成的条数
+    :param seed:
+    :param length: 每条的大致长度
+    :return:
+    """
+    rng = random.Random(seed)
+    makers = [
+        lambda: rng.choice(_HANZI) * length,
+        lambda: '哈' * (length // 2) + '！' * (length // 2),
+        lambda: (_hanzi(rng, 3) * (length // 3)),
+        lambda: '.' * length + _hanzi(rng, 5),
+        lambda: ' ' * length + 'a',
+        lambda: '.'.join('a' for _ in range(length // 2)),
+        lambda: (rng.choice(_SYMBOLS) + rng.choice(_PUNCTUATION)) * (length // 2),
+    ]
+    return [makers[i % len(makers)]() for i in range(size)]
+
+
+def spam_posts(size, seed=0, length=20000):
+    """
+    病态输入：很长的垃圾帖子，重复的句子和重复两次的长段落，看起来接近重复但被数字和 I 打断的串，
+    以及超长的字母，点分隔串，空白和链接，邮箱的片段，用于测量单条文本的最长耗时
+    :param size: 生成的条数
+    :param seed:
+    :param length: 每条的大致长度
+    :return:
+    """
+    rng = random.Random(seed)
+    makers = [
+        lambda: _hanzi(rng, length),
+        lambda: _hanzi(rng, length // 2) * 2,
+        lambda: (_sentence(rng) * 2 + rng.choice(_SYMBOLS)) * (length // 60),
+        lambda: ('哈' * 19 + 'I') * (length // 20),
+        lambda: ''.join(_sentence(rng) * 3 + str(rng.randint(0, 9)) for _ in range(length // 60)),
+        lambda: rng.choice(string.ascii_letters) * length,
+        lambda: 'a.' * (length // 2),
+        lambda: ' ' * length + rng.choice(_WORDS),
+        lambda: 'http://' * (length // 7),
+        lambda: '-_' * (length // 2),
+        lambda: 'a@' * (length // 2),
+    ]
+    return [makers[i % len(makers)]() for i in range(size)]
+
+
+CORPORA = {
+    'weibo': weibo_posts,
+    'article': mixed_articles,
+    'html': html_pages,
+    'repeated': repeated_chars,
+    'spam': spam_posts,
+}
+
+# 每种语料在不同规模下生成的文档数
+SIZES = {
+    'small': {'weibo': 200, 'article': 5, 'html': 10, 'repeated': 14, 'spam': 11},
+    'medium': {'weibo': 2000, 'article': 50, 'html': 100, 'repeated': 70, 'spam': 22},
+    'large': {'weibo': 20000, 'article': 500, 'html': 1000, 'repeated': 700, 'spam': 110},
+}
+
+
+def build_corpora(size='small', seed=0):
+    """
+    :param size: small, medium 或 large
+    :param seed:
+    :return: 语料名到文本list的dict
+    """
+    return {name: CORPORA[name](SIZES[size][name], seed=seed) for name in CORPORA}
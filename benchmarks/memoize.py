@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+memoize 命中缓存时的开销，和 functools.lru_cache 对比。
+
+    python -m benchmarks.memoize --number 200000
+"""
+
+import argparse
+import functools
+import sys
+import timeit
+
+from nlpyutil.memorize import memoize
+
+
+def _add(a, b=0):
+    return a + b
+
+
+def cases():
+    """
+    :return: (用例名, 被测函数, 参数, 关键字参数) 的list，所有调用都命中缓存
+    """
+    lru_unbounded = functools.lru_cache(maxsize=None)(_add)
+    lru_bounded = functools.lru_cache(maxsize=128)(_add)
+    memo_unbounded = memoize()(_add)
+    memo_bounded = memoize(maxsize=128)(_add)
+    memo_lfu = memoize(maxsize=128, policy='lfu')(_add)
+    memo_untyped = memoize(typed=False)(_add)
+    memo_unhashable = memoize()(lambda items: len(items))
+    return [
+        ('plain call', _add, (1,), {}),
+        ('lru_cache(maxsize=None)', lru_unbounded, (1,), {}),
+        ('lru_cache(maxsize=128)', lru_bounded, (1,), {}),
+        ('memoize()', memo_unbounded, (1,), {}),
+        ('memoize() kwargs', memo_unbounded, (1,), {'b': 2}),
+        ('memoize(maxsize=128)', memo_bounded, (1,), {}),
+        ('memoize(maxsize=128, lfu)', memo_lfu, (1,), {}),
+        ('memoize(typed=False)', memo_untyped, (1,), {}),
+        ('memoize() unhashable, pickle+sha1', memo_unhashable, ([1, 2, 3],), {}),
+    ]
+
+
+def measure(func, args, kwargs, number):
+    """
+    :return: 每次调用的纳秒数，取5次中最好的一次
+    """
+    func(*args, **kwargs)
+    best = min(timeit.repeat(lambda: func(*args, **kwargs), number=number, repeat=5))
+    return best / number * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='memoize hit-path overhead')
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args(argv)
+    for name, func, call_args, call_kwargs in cases():
+        print('{:<40} {:>10.1f} ns/call'.format(name, measure(func, call_args, call_kwargs, args.number)), flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
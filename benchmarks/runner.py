@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+基准测试入口，测量每个用例在每种语料上的吞吐量，单条文本的最长耗时和峰值内存，
+结果以json输出，并可以和保存的基线结果对比，发现性能回退时返回非0状态码。
+
+    python -m benchmarks.runner --size small --output bench.json
+    python -m benchmarks.runner --baseline bench.json --tolerance 0.2
+    python -m benchmarks.runner --filter duplacte --max-doc-ms 200
+
+基线结果和运行的机器相关，只应该和同一台机器上的结果对比
+"""
+
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+
+from benchmarks.cases import default_cases
+from benchmarks.corpus import build_corpora
+
+
+def measure(func, texts, repeat=3):
+    """
+    :param func: 被测函数
+    :param texts: 语料
+    :param repeat: 重复次数，吞吐量取最好的一次
+    :return:
+    """
+    # 预热，避免把分词词典加载等一次性的初始化计入耗时
+    for text in texts[:1]:
+        func(text)
+    best = float('inf')
+    max_doc_seconds = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            doc_start = time.perf_counter()
+            func(text)
+            max_doc_seconds = max(max_doc_seconds, time.perf_counter() - doc_start)
+        best = min(best, time.perf_counter() - start)
+    # 内存单独测量，tracemalloc 会明显拖慢执行速度
+    tracemalloc.start()
+    try:
+        for text in texts:
+            func(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    chars = sum(len(text) for text in texts)
+    return {
+        'docs': len(texts),
+        'chars': chars,
+        'seconds': best,
+        'docs_per_sec': len(texts) / best if best else 0.0,
+        'chars_per_sec': chars / best if best else 0.0,
+        'max_doc_seconds': max_doc_seconds,
+        'peak_memory_bytes': peak,
+    }
+
+
+def run(cases, corpora, repeat=3, pattern=None, verbose=True):
+    """
+    :param cases: BenchmarkCase 的list
+    :param corpora: 语料名到文本list的dict
+    :param repeat:
+    :param pattern: 只运行名字匹配此正则的用例
+    :param verbose: 是否打印每个用例的结果
+    :return: 用例名/语料名 到测量结果的dict
+    """
+    results = {}
+    for case in cases:
+        if pattern and not re.search(pattern, case.name):
+            continue
+        for corpus, texts in corpora.items():
+            if not case.runs_on(corpus):
+                continue
+            key = '{}/{}'.format(case.name, corpus)
+            results[key] = measure(case.func, texts, repeat=repeat)
+            if verbose:
+                print('{:<55} {:>12.1f} docs/s {:>14.1f} chars/s {:>10.2f} ms max {:>12d} B peak'.format(
+                    key, results[key]['docs_per_sec'], results[key]['chars_per_sec'],
+                    results[key]['max_doc_seconds'] * 1000, results[key]['peak_memory_bytes']), flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    和基线结果对比
+    :param results: 本次的测量结果
+    :param baseline: 基线的测量结果
+    :param tolerance: 允许的吞吐量下降比例
+    :return: 出现回退的 (用例, 本次吞吐量/基线吞吐量) 的list
+    """
+    regressions = []
+    for key, current in results.items():
+        if key not in baseline or not baseline[key]['docs_per_sec']:
+            continue
+        ratio = current['docs_per_sec'] / baseline[key]['docs_per_sec']
+        if ratio < 1 - tolerance:
+            regressions.append((key, ratio))
+    return regressions
+
+
+def check_latency(results, max_doc_seconds):
+    """
+    :param results: 测量结果
+    :param max_doc_seconds: 单条文本允许的最长耗时
+    :return: 超时的 (用例, 单条文本最长耗时) 的list
+    """
+    return [(key, current['max_doc_seconds']) for key, current in results.items()
+            if current['max_doc_seconds'] > max_doc_seconds]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='nlpyutil benchmarks')
+    parser.add_argument('--size', default='small', choices=['small', 'medium', 'large'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', default=None, help='only run cases whose name matches this regex')
+    parser.add_argument('--output', default=None, help='write results as json to this file')
+    parser.add_argument('--baseline', default=None, help='compare against results saved by --output')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed throughput drop, 0.1 means 10%%')
+    parser.add_argument('--max-doc-ms', type=float, default=None,
+                        help='fail if any single document takes longer than this many milliseconds')
+    args = parser.parse_args(argv)
+
+    results = run(default_cases(), build_corpora(args.size, args.seed), repeat=args.repeat, pattern=args.filter)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'size': args.size,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    failed = False
+    if args.max_doc_ms is not None:
+        for key, seconds in check_latency(results, args.max_doc_ms / 1000):
+            print('SLOW {}: {:.2f} ms for a single document'.format(key, seconds * 1000))
+            failed = True
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for key, ratio in regressions:
+            print('REGRESSION {}: {:.1%} of baseline throughput'.format(key, ratio))
+        if regressions:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
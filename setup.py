@@ -47,8 +47,11 @@ install_requires = [
     deps["jieba"]
 ]
 
+with open('src/nlpyutil/__init__.py', 'r', encoding='utf-8') as file:
+    version = re.search(r"^__version__ = '([^']+)'", file.read(), re.M).group(1)
+
 setup(name='nlpyutil',
-      version='0.4.0',
+      version=version,
       description='Personal usual utils for python',
       long_description=open("README.md", "r", encoding="utf-8").read(),
       long_description_content_type="text/markdown",
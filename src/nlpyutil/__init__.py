@@ -22,6 +22,8 @@
 # SOFTWARE.
 
 
+__version__ = '0.4.0'
+
 from .singleton import Singleton
 from .logger import Logger
 from .memorize import memoize
@@ -29,8 +29,6 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Iterable, List, NewType, Optional, Tuple, Union
 
-import yaml
-
 DataClass = NewType("DataClass", Any)
 DataClassType = NewType("DataClassType", Any)
 
@@ -231,6 +229,7 @@ class SdArgumentParser(ArgumentParser):
         """
         从yaml文件中解析参数
         """
+        import yaml
         with open(yaml_file, encoding='utf-8') as config_data_file:
             data = yaml.safe_load(config_data_file)
         outputs = []
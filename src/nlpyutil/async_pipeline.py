@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+from collections.abc import Iterable
+from functools import partial
+
+
+class AsyncPreprocessor(object):
+    '''
+    在asyncio服务中使用PreprocessPipeline：
+      1. 实际的处理放到executor中执行，不会阻塞事件循环
+      2. 使用信号量限制同时在处理中的文档数
+      3. 并发到达的请求会被合并为一个批次，一次性提交给executor。没有批次在处理中时，
+         同一轮事件循环中到达的请求立即提交；否则最多等待 max_delay
+    '''
+
+    def __init__(self, pipeline, executor=None, max_concurrency=1024, max_batch_size=64, max_delay=0.002):
+        '''
+        :param pipeline: PreprocessPipeline 对象
+        :param executor: 执行处理的executor，None表示使用事件循环默认的线程池。
+                         使用ProcessPoolExecutor时pipeline中的函数必须可以被pickle
+        :param max_concurrency: 同时在处理中的最大文档数
+        :param max_batch_size: 每个批次最多包含的文档数，达到后立即提交
+        :param max_delay: 有批次在处理中时，新批次的最长等待时间（秒），超时后即使未满也会提交
+        '''
+        self._pipeline = pipeline
+        self._executor = executor
+        self._max_concurrency = max_concurrency
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._loop = None
+        self._semaphore = None
+        self._pending = []
+        self._flush_handle = None
+        self._in_flight = 0
+
+    @property
+    def executor(self):
+        return self._executor
+
+    async def aprocess(self, data):
+        '''
+        异步处理单条文本，或者文本的list
+        :param data:
+        :return: 和PreprocessPipeline.process的返回一致
+        '''
+        if not isinstance(data, str) and isinstance(data, Iterable):
+            return list(await asyncio.gather(*[self.aprocess(str(text)) for text in data]))
+        loop = self._bind_loop()
+        async with self._semaphore:
+            future = loop.create_future()
+            self._pending.append((data, future))
+            if len(self._pending) >= self._max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                if self._in_flight:
+                    self._flush_handle = loop.call_later(self._max_delay, self._flush)
+                else:
+                    self._flush_handle = loop.call_soon(self._flush)
+            return await future
+
+    def _bind_loop(self):
+        '''
+        信号量等对象只能在创建时的事件循环中使用，事件循环变化时需要重新创建
+        :return:
+        '''
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._pending = []
+            self._flush_handle = None
+            self._in_flight = 0
+        return loop
+
+    def _flush(self):
+        '''
+        将当前等待中的文档作为一个批次提交给executor
+        :return:
+        '''
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        texts = [text for text, _ in pending]
+        self._in_flight += 1
+        task = self._loop.run_in_executor(self._executor, self._pipeline._process_batch, texts)
+        task.add_done_callback(self._batch_done)
+        task.add_done_callback(partial(_set_results, pending))
+
+    def _batch_done(self, task):
+        '''
+        批次处理完成，没有其他批次在处理中时立即提交等待中的文档
+        :param task:
+        :return:
+        '''
+        if task.get_loop() is not self._loop:
+            return
+        self._in_flight -= 1
+        if not self._in_flight and self._pending:
+            self._flush()
+
+
+def _set_results(pending, task):
+    '''
+    将批次的处理结果分发给每个请求
+    :param pending: (文本, future) 的list
+    :param task: executor 返回的future
+    :return:
+    '''
+    if task.cancelled():
+        for _, future in pending:
+            if not future.done():
+                future.cancel()
+        return
+    error = task.exception()
+    if error is not None:
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+        return
+    for (_, future), result in zip(pending, task.result()):
+        if not future.done():
+            future.set_result(result)
@@ -22,9 +22,20 @@
 # SOFTWARE.
 
 import re
+import sys
 import six
 import unicodedata
-from nlpyutil import usual_pattern
+from functools import lru_cache
+from nlpyutil import char_table, usual_pattern
+
+# 全角转半角的转换表：全角空格直接转换，其它全角字符根据关系转化
+_DBC_TABLE = {12288: 32}
+_DBC_TABLE.update({code: code - 65248 for code in range(65281, 65375)})
+# 连续的全角字符，只对这些片段做转换，其余文本由正则在C中直接跳过
+_FULL_WIDTH_RUN = re.compile('[\u3000\uff01-\uff5e]+')
+# 半角转全角的转换表
+_SBC_TABLE = {32: 12288}
+_SBC_TABLE.update({code: code + 65248 for code in range(33, 127)})
 
 
 def convert_to_unicode(text):
@@ -69,49 +80,78 @@ def printable_text(text):
 def str_to_dbc(ustring):
     '''
     把字符串全角转半角
-    :param ustring:
+    :param ustring: 字符串，或者字符串的list（转换后拼接在一起）
     :return:
     '''
-    ss = []
-    for s in ustring:
-        rstring = ""
-        for uchar in s:
-            inside_code = ord(uchar)
-            # 全角空格直接转换
-            if inside_code == 12288:
-                inside_code = 32
-            # 全角字符（除空格）根据关系转化
-            elif (inside_code >= 65281 and inside_code <= 65374):
-                inside_code -= 65248
-            rstring += chr(inside_code)
-        ss.append(rstring)
-    return ''.join(ss)
+    if isinstance(ustring, str):
+        return _FULL_WIDTH_RUN.sub(_full_width_run_to_dbc, ustring)
+    return ''.join(_FULL_WIDTH_RUN.sub(_full_width_run_to_dbc, s) for s in ustring)
+
+
+def _full_width_run_to_dbc(match):
+    return match.group().translate(_DBC_TABLE)
 
 
 def str_to_sbc(ustring):
     '''
-    把字符串全角转半角
-    :param ustring:
+    把字符串半角转全角
+    :param ustring: 字符串，或者字符串的list（转换后拼接在一起）
+    :return:
+    '''
+    if isinstance(ustring, str):
+        return ustring.translate(_SBC_TABLE)
+    return ''.join(s.translate(_SBC_TABLE) for s in ustring)
+
+
+def build_translate_table(predicate, repl=None):
+    '''
+    遍历所有unicode码位，为满足predicate的字符构建 str.translate 使用的转换表
+    :param predicate: 接收单个字符的判断函数
+    :param repl: 替换成的字符，None表示删除
+    :return:
+    '''
+    return {code: repl for code in range(sys.maxunicode + 1) if predicate(chr(code))}
+
+
+@lru_cache(maxsize=None)
+def flag_table(flags, repl=None):
+    '''
+    字符类别表（见char_table）中属于指定类别的字符的转换表，首次使用时构建
+    :param flags: char_table 中一个或多个flag的按位或
+    :param repl: 替换成的字符，None表示删除
     :return:
     '''
-    ss = []
-    for s in ustring:
-        rstring = ""
-        for uchar in s:
-            inside_code = ord(uchar)
-            # 全角空格直接转换
-            if inside_code == 32:
-                inside_code = 12288
-            # 全角字符（除空格）根据关系转化
-            elif (inside_code >= 33 and inside_code <= 126):
-                inside_code += 65248
-            rstring += chr(inside_code)
-        ss.append(rstring)
-    return ''.join(ss)
+    return {code: repl for code in char_table.code_points(flags)}
+
+
+def punctuation_table(repl=None):
+    '''
+    标点符号（见is_punctuation）的转换表，首次使用时构建
+    :param repl: 标点替换成的字符，None表示删除
+    :return:
+    '''
+    return flag_table(char_table.PUNCTUATION, repl)
+
+
+@lru_cache(maxsize=None)
+def category_table(categories, repl=None):
+    '''
+    指定unicode类别的字符的转换表，首次使用时构建
+    :param categories: unicode类别的tuple，如 ('So', 'Sc')
+    :param repl: 替换成的字符，None表示删除
+    :return:
+    '''
+    return build_translate_table(lambda char: unicodedata.category(char) in categories, repl)
 
 
 def is_whitespace(char):
     """判断字符是否是空白符"""
+    if len(char) == 1:
+        return bool(char_table.get_table()[ord(char)] & char_table.WHITESPACE)
+    return _is_whitespace_slow(char)
+
+
+def _is_whitespace_slow(char):
     if re.match(usual_pattern.PATTERN_WHITE_SPACE, char):
         return True
     # 有些字符技术上是控制字符，但实际使用中将其对待为空白符
@@ -134,6 +174,10 @@ def is_visiable_ascii(char):
 
 def is_punctuation(char):
     """检查一个字符是否是标点符号"""
+    return bool(char_table.get_table()[ord(char)] & char_table.PUNCTUATION)
+
+
+def _is_punctuation_slow(char):
     cp = ord(char)
     #  ASCII码中，不是数字和字母外的其它字符都算作标点符号
     if ((cp >= 33 and cp <= 47) or (cp >= 58 and cp <= 64) or
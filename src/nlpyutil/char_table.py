@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+覆盖全部unicode码位的字符类别表，每个码位对应一个16位的flag，判断字符类别只需要一次查表。
+表只构建一次：依次尝试内存映射安装包中的 data/char_table.bin（安装包中默认不带，
+可以用 python -m nlpyutil.char_table 生成）和用户缓存目录中的 char_table.bin，
+文件不存在或者和当前的unicode版本、生僻字表不一致时在内存中构建，并写入用户缓存目录供之后的进程使用。
+fork出的子进程直接共享父进程中已经加载的表
+"""
+
+import hashlib
+import mmap
+import os
+import string
+import sys
+import unicodedata
+
+import numpy as np
+
+from . import rarewords, usual_pattern
+
+PUNCTUATION = 1 << 0  # 标点符号，见 ch_utils.is_punctuation
+WHITESPACE = 1 << 1  # 空白符，见 ch_utils.is_whitespace
+CJK = 1 << 2  # 常用汉字 一-龥
+RARE = 1 << 3  # 生僻字，见 rarewords.RAREWORDS
+SYMBOL = 1 << 4  # 符号和货币符号，unicode类别为 So、Sc
+LATIN = 1 << 5  # 英文字母 a-z、A-Z
+VISIBLE_ASCII = 1 << 6  # 可见ascii码，见 ch_utils.is_visiable_ascii
+PRINTABLE = 1 << 7  # string.printable 中的字符
+CHINESE = 1 << 8  # preprocess_remove_not_chinese 保留的字符：常用汉字和中文标点
+
+TABLE_SIZE = sys.maxunicode + 1
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'char_table.bin')
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'nlpyutil', 'char_table.bin')
+
+_MAGIC = b'NLPYCT01'
+_HEADER_SIZE = 64
+_table = None
+_buffer = None
+
+
+def build_array():
+    '''
+    遍历所有码位构建类别表
+    :return: 长度为 TABLE_SIZE 的 uint16 数组
+    '''
+    flags = np.zeros(TABLE_SIZE, dtype=np.uint16)
+    for code in range(TABLE_SIZE):
+        char = chr(code)
+        category = unicodedata.category(char)
+        if category[0] == 'P':
+            flags[code] = PUNCTUATION
+        elif category in ('So', 'Sc'):
+            flags[code] = SYMBOL
+        elif category in ('Zs', 'Cf') or char.isspace():
+            flags[code] = WHITESPACE
+    # ASCII码中，不是数字和字母外的其它字符都算作标点符号
+    for start, end in ((33, 47), (58, 64), (91, 96), (123, 126)):
+        flags[start:end + 1] |= PUNCTUATION
+    # usual_pattern.PATTERN_WHITE_SPACE 中的 \u2000-\u2010
+    flags[0x2000:0x2011] |= WHITESPACE
+    flags[0x4e00:0x9fa6] |= CJK | CHINESE
+    flags[ord('a'):ord('z') + 1] |= LATIN
+    flags[ord('A'):ord('Z') + 1] |= LATIN
+    flags[32:127] |= VISIBLE_ASCII
+    flags[[ord(char) for char in string.printable]] |= PRINTABLE
+    flags[[ord(char) for char in rarewords.RAREWORDS]] |= RARE
+    flags[[ord(char) for char in usual_pattern.DATA_CHINESE_PUNCTUATION + [',', '!']]] |= CHINESE
+    return flags
+
+
+def version_key():
+    '''
+    类别表的版本，由unicode版本、生僻字表、中文标点和字节序决定，任何一项变化都需要重新生成表文件
+    :return:
+    '''
+    source = repr((unicodedata.unidata_version, sys.byteorder, rarewords.RAREWORDS,
+                   usual_pattern.DATA_CHINESE_PUNCTUATION))
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=16).hexdigest().encode('ascii')
+
+
+def save(path=None, flags=None):
+    '''
+    将类别表保存为文件，用于之后的内存映射加载
+    :param path: 文件路径，默认为安装包中的 data/char_table.bin
+    :param flags: build_array 的结果，None时重新构建
+    :return:
+    '''
+    if path is None:
+        path = DEFAULT_PATH
+    if flags is None:
+        flags = build_array()
+    header = (_MAGIC + version_key()).ljust(_HEADER_SIZE, b'\0')
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temp_path, 'wb') as file:
+        file.write(header)
+        file.write(flags.astype(np.uint16).tobytes())
+    os.replace(temp_path, path)
+
+
+def load(path=None):
+    '''
+    以只读方式内存映射类别表文件
+    :param path: 文件路径，默认为安装包中的 data/char_table.bin
+    :return: 内存映射的buffer，文件不存在或者版本不一致时返回None
+    '''
+    if path is None:
+        path = DEFAULT_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        header = file.read(_HEADER_SIZE)
+        if header != (_MAGIC + version_key()).ljust(_HEADER_SIZE, b'\0') \
+                or os.fstat(file.fileno()).st_size != _HEADER_SIZE + TABLE_SIZE * 2:
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def get_table():
+    '''
+    获取类别表，首次调用时加载或者构建
+    :return: 以码位为下标，元素为flag的 memoryview
+    '''
+    global _table, _buffer
+    if _table is None:
+        buffer = load() or load(CACHE_PATH)
+        if buffer is None:
+            flags = build_array()
+            try:
+                save(CACHE_PATH, flags)
+            except OSError:
+                pass
+            buffer = flags.tobytes()
+            view = memoryview(buffer)
+        else:
+            view = memoryview(buffer)[_HEADER_SIZE:]
+        _buffer = buffer
+        _table = view.cast('H')
+    return _table
+
+
+def as_array():
+    '''
+    :return: 和 get_table 共享内存的只读 numpy 数组
+    '''
+    return np.frombuffer(get_table(), dtype=np.uint16)
+
+
+def code_points(flag):
+    '''
+    :param flag: 一个或多个flag的按位或
+    :return: 属于其中任意类别的所有码位
+    '''
+    return np.flatnonzero(as_array() & flag).tolist()
+
+
+def flags_of(char):
+    '''
+    :param char: 单个字符
+    :return: 该字符的flag
+    '''
+    return get_table()[ord(char)]
+
+
+if __name__ == '__main__':
+    # 打包前生成 data/char_table.bin：python -m nlpyutil.char_table [path]
+    save(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+from collections import deque
+
+FORMAT_TEXT = 'text'
+FORMAT_TSV = 'tsv'
+FORMAT_JSONL = 'jsonl'
+
+
+class CorpusProcessor(object):
+    '''
+    文件到文件的语料处理：逐行读取输入文件，经过PreprocessPipeline处理后批量写入输出文件。
+    处理过程中定期记录输入和输出文件的字节偏移量，任务中断后可以从上次的位置继续处理
+    '''
+
+    def __init__(self, pipeline, input_format=FORMAT_TEXT, column=0, field='text', sep='\t',
+                 batch_size=1000, checkpoint_interval=100000, workers=None, chunksize=100,
+                 buffer_size=1 << 20, encoding='utf-8'):
+        '''
+        :param pipeline: PreprocessPipeline 对象
+        :param input_format: 输入格式，text：每行一条文本；tsv：处理第column列；jsonl：处理每行json的field字段
+        :param column: tsv格式中需要处理的列
+        :param field: jsonl格式中需要处理的字段
+        :param sep: tsv格式的分隔符
+        :param batch_size: 每次批量写入的行数
+        :param checkpoint_interval: 每处理多少行记录一次断点
+        :param workers: 进程数，大于1时使用多进程处理
+        :param chunksize: 多进程处理时每个任务包含的文档数
+        :param buffer_size: 读写文件的缓冲区大小
+        :param encoding: 文件编码
+        '''
+        if input_format not in (FORMAT_TEXT, FORMAT_TSV, FORMAT_JSONL):
+            raise ValueError('unsupported input format: {}'.format(input_format))
+        self._pipeline = pipeline
+        self._input_format = input_format
+        self._column = column
+        self._field = field
+        self._sep = sep
+        self._batch_size = batch_size
+        self._checkpoint_interval = checkpoint_interval
+        self._workers = workers
+        self._chunksize = chunksize
+        self._buffer_size = buffer_size
+        self._encoding = encoding
+
+    def run(self, input_path, output_path, checkpoint_path=None, resume=True):
+        '''
+        处理整个文件
+        :param input_path: 输入文件
+        :param output_path: 输出文件
+        :param checkpoint_path: 断点文件，默认为 output_path + '.checkpoint'
+        :param resume: 是否从断点继续，为False时从头开始处理并覆盖输出文件
+        :return: 输出文件中的总行数
+        '''
+        if checkpoint_path is None:
+            checkpoint_path = output_path + '.checkpoint'
+        checkpoint = self._load_checkpoint(checkpoint_path, input_path) if resume else None
+        if checkpoint:
+            input_offset, output_offset, count = (checkpoint['input_offset'],
+                                                  checkpoint['output_offset'],
+                                                  checkpoint['records'])
+        else:
+            input_offset, output_offset, count = 0, 0, 0
+
+        records = deque()
+        with open(input_path, 'rb', buffering=self._buffer_size) as reader, \
+                self._open_output(output_path, output_offset) as writer:
+            reader.seek(input_offset)
+
+            def texts():
+                for record, text, offset in self._read_records(reader, input_offset):
+                    records.append((record, offset))
+                    yield text
+
+            results = self._pipeline.process_stream(texts(), batch_size=self._batch_size,
+                                                    workers=self._workers, chunksize=self._chunksize)
+            lines = []
+            last_checkpoint = count
+            for result in results:
+                record, input_offset = records.popleft()
+                lines.append(self._format(record, result))
+                count += 1
+                if len(lines) >= self._batch_size:
+                    writer.write(''.join(lines).encode(self._encoding))
+                    lines = []
+                    if self._checkpoint_interval and count - last_checkpoint >= self._checkpoint_interval:
+                        self._save_checkpoint(checkpoint_path, writer, input_path, input_offset, count)
+                        last_checkpoint = count
+            if lines:
+                writer.write(''.join(lines).encode(self._encoding))
+            self._save_checkpoint(checkpoint_path, writer, input_path, input_offset, count)
+
+        return count
+
+    def _read_records(self, reader, offset):
+        '''
+        逐行读取文件，同时记录每行结束时的字节偏移量
+        :param reader:
+        :param offset: 开始读取时的偏移量
+        :return: (解析后的行, 需要处理的文本, 行结束时的偏移量)
+        '''
+        for raw in reader:
+            offset += len(raw)
+            line = raw.decode(self._encoding).rstrip('\r\n')
+            if self._input_format == FORMAT_TSV:
+                record = line.split(self._sep)
+                if self._column >= len(record):
+                    raise ValueError('column {} does not exist in line: {}'.format(self._column, line))
+                text = record[self._column]
+            elif self._input_format == FORMAT_JSONL:
+                record = json.loads(line) if line.strip() else None
+                text = record.get(self._field, '') if record else ''
+            else:
+                record = None
+                text = line
+            yield record, text, offset
+
+    def _format(self, record, result):
+        '''
+        将处理结果格式化为输出的一行
+        :param record:
+        :param result:
+        :return:
+        '''
+        if self._input_format == FORMAT_TSV:
+            record[self._column] = str(result)
+            return self._sep.join(record) + '\n'
+        elif self._input_format == FORMAT_JSONL:
+            if record is None:
+                return '\n'
+            record[self._field] = result
+            return json.dumps(record, ensure_ascii=False) + '\n'
+        return str(result) + '\n'
+
+    def _open_output(self, output_path, output_offset):
+        '''
+        打开输出文件，从断点继续时截断断点之后写入的不完整数据
+        :param output_path:
+        :param output_offset:
+        :return:
+        :raise ValueError: 从断点继续时输出文件不存在或比断点短，已经处理的数据丢失
+        '''
+        if output_offset:
+            if not os.path.exists(output_path):
+                raise ValueError('output file {} of the checkpoint does not exist'.format(output_path))
+            size = os.path.getsize(output_path)
+            if size < output_offset:
+                raise ValueError('output file {} is shorter than the checkpoint: {} < {}'.format(output_path, size,
+                                                                                               output_offset))
+            writer = open(output_path, 'r+b', buffering=self._buffer_size)
+            writer.truncate(output_offset)
+            writer.seek(output_offset)
+            return writer
+        return open(output_path, 'wb', buffering=self._buffer_size)
+
+    def _load_checkpoint(self, checkpoint_path, input_path):
+        '''
+        读取断点信息
+        :param checkpoint_path:
+        :param input_path:
+        :return: 断点信息，没有断点时返回None
+        '''
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path, 'r', encoding='utf-8') as file:
+            checkpoint = json.load(file)
+        if checkpoint.get('input_path') != os.path.abspath(input_path):
+            raise ValueError('checkpoint {} belongs to another input file: {}'.format(checkpoint_path,
+                                                                                   checkpoint.get('input_path')))
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint_path, writer, input_path, input_offset, count):
+        '''
+        先将输出落盘，再原子地更新断点文件，保证断点中记录的位置都已经写入
+        :param checkpoint_path:
+        :param writer:
+        :param input_path:
+        :param input_offset:
+        :param count:
+        :return:
+        '''
+        writer.flush()
+        os.fsync(writer.fileno())
+        checkpoint = {
+            'input_path': os.path.abspath(input_path),
+            'input_offset': input_offset,
+            'output_offset': writer.tell(),
+            'records': count
+        }
+        temp_path = checkpoint_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(checkpoint, file)
+        os.replace(temp_path, checkpoint_path)
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+基于MinHash和LSH的近似重复文本检测
+"""
+
+from itertools import islice
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_LOW_29_BITS = np.uint64((1 << 29) - 1)
+_NGRAM_BASE = np.uint64(1000003)
+
+
+class MinHasher(object):
+    '''
+    以字符n-gram为特征计算MinHash签名，批量计算时所有文本的n-gram哈希和签名都由numpy向量化完成
+    '''
+
+    def __init__(self, num_perm=128, ngram=3, seed=1):
+        '''
+        :param num_perm: 签名长度，即哈希函数的个数
+        :param ngram: 字符n-gram的长度，短于ngram的文本整体作为一个特征
+        :param seed: 随机种子，相同的种子生成的签名可以相互比较
+        '''
+        self.num_perm = num_perm
+        self.ngram = ngram
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts):
+        '''
+        批量计算签名
+        :param texts: 文本的list
+        :return: (len(texts), num_perm) 的uint32矩阵，空文本的签名全部为最大值
+        '''
+        result = np.full((len(texts), self.num_perm), _MAX_HASH, dtype=np.uint32)
+        hashes, counts = self._shingle_hashes(texts)
+        non_empty = np.flatnonzero(counts)
+        if not len(non_empty):
+            return result
+        # 每篇文档的特征在 hashes 中的起始位置
+        offsets = np.concatenate(([0], np.cumsum(counts[non_empty])[:-1]))
+        for i in range(self.num_perm):
+            values = _universal_hash(self._a[i], self._b[i], hashes) & _MAX_HASH
+            result[non_empty, i] = np.minimum.reduceat(values, offsets)
+        return result
+
+    def signature(self, text):
+        return self.signatures([text])[0]
+
+    def _shingle_hashes(self, texts):
+        '''
+        计算所有文本的n-gram哈希，文本之间插入 ngram-1 个空字符，保证n-gram不会跨越文本
+        :param texts:
+        :return: (所有n-gram的32位哈希, 每篇文本的n-gram个数)
+        '''
+        n = self.ngram
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        counts = np.where(lengths > 0, np.maximum(lengths - n + 1, 1), 0)
+        separator = '\x00' * (n - 1)
+        joined = separator.join(texts) + separator
+        code_points = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32).astype(np.uint64)
+
+        windows = len(code_points) - n + 1
+        hashes = np.zeros(max(windows, 0), dtype=np.uint64)
+        for k in range(n):
+            hashes = hashes * _NGRAM_BASE + code_points[k:k + windows]
+        # murmur3的finalizer，打散相近的n-gram哈希
+        hashes ^= hashes >> np.uint64(33)
+        hashes *= np.uint64(0xff51afd7ed558ccd)
+        hashes ^= hashes >> np.uint64(33)
+        hashes &= _MAX_HASH
+
+        doc_starts = np.concatenate(([0], np.cumsum(lengths + n - 1)[:-1]))
+        shingle_starts = np.repeat(doc_starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        positions = np.arange(counts.sum(), dtype=np.int64) + shingle_starts
+        return hashes[positions], counts
+
+
+def _mod_mersenne(values):
+    '''
+    :param values: 小于2^64的uint64数组
+    :return: values % (2^61 - 1)，利用 2^61 ≡ 1 只用位运算
+    '''
+    values = (values & _MERSENNE_PRIME) + (values >> np.uint64(61))
+    return np.where(values >= _MERSENNE_PRIME, values - _MERSENNE_PRIME, values)
+
+
+def _universal_hash(a, b, hashes):
+    '''
+    (a * x + b) mod (2^61 - 1)，a, b 小于2^61，x 为32位哈希。a 拆分成高29位和低32位相乘，
+    每一步的乘积都小于2^64，不会溢出
+    :param a:
+    :param b:
+    :param hashes:
+    :return:
+    '''
+    low = _mod_mersenne((a & _MAX_HASH) * hashes)
+    high = _mod_mersenne((a >> np.uint64(32)) * hashes)
+    # high * 2^32 = (high的高32位) * 2^61 + (high的低29位) * 2^32
+    high = ((high & _LOW_29_BITS) << np.uint64(32)) + (high >> np.uint64(29))
+    return _mod_mersenne(low + high + b)
+
+
+def _optimal_bands(threshold, num_perm):
+    '''
+    选择 bands * rows = num_perm 中，使得S曲线的阈值 (1/bands)^(1/rows) 最接近threshold的组合
+    :param threshold:
+    :param num_perm:
+    :return: (bands, rows)
+    '''
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class LSHIndex(object):
+    '''
+    MinHash签名的LSH索引：签名被切分为bands段，任意一段完全相同的文档成为候选
+    '''
+
+    def __init__(self, threshold=0.8, num_perm=128):
+        '''
+        :param threshold: Jaccard相似度阈值
+        :param num_perm: 签名长度
+        '''
+        self.threshold = threshold
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        self._buckets = [dict() for _ in range(self.bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def insert(self, key, signature):
+        self._signatures[key] = signature
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, []).append(key)
+
+    def query(self, signature):
+        '''
+        :param signature:
+        :return: 估计的Jaccard相似度不低于阈值的文档key，按相似度从高到低排列
+        '''
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        matched = []
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold:
+                matched.append((similarity, key))
+        matched.sort(key=lambda item: (-item[0], item[1]))
+        return [key for _, key in matched]
+
+
+class NearDuplicateFilter(object):
+    '''
+    流式的近似重复文本过滤，每篇文本和之前出现过的所有文本比较：
+      1. filter：丢弃近似重复的文本
+      2. tag：返回每篇文本重复的原文本序号
+      3. 作为PreprocessPipeline的处理函数：近似重复的文本返回空字符串。流式处理时每次收到整批文档，批量计算签名。
+         注意多进程处理时每个进程只在自己处理过的文本中去重，并且不能和结果缓存同时使用
+    '''
+
+    # PreprocessPipeline 流式处理时传入整批文档
+    batched = True
+
+    def __init__(self, threshold=0.8, num_perm=128, ngram=3, seed=1, batch_size=1024):
+        '''
+        :param threshold: Jaccard相似度阈值，不低于此值认为是重复
+        :param num_perm: MinHash签名长度
+        :param ngram: 字符n-gram的长度
+        :param seed: 随机种子
+        :param batch_size: 流式处理时每批计算签名的文本数
+        '''
+        self._hasher = MinHasher(num_perm=num_perm, ngram=ngram, seed=seed)
+        self._index = LSHIndex(threshold=threshold, num_perm=num_perm)
+        self._batch_size = batch_size
+        self._count = 0
+
+    def find_duplicates(self, texts):
+        '''
+        检查一批文本，并把不重复的文本加入索引
+        :param texts: 文本的list
+        :return: 每篇文本重复的原文本序号（按出现的顺序从0开始），不重复时为None
+        '''
+        signatures = self._hasher.signatures(texts)
+        result = []
+        for text, signature in zip(texts, signatures):
+            duplicate_of = None
+            if text:
+                matched = self._index.query(signature)
+                if matched:
+                    duplicate_of = matched[0]
+                else:
+                    self._index.insert(self._count, signature)
+            result.append(duplicate_of)
+            self._count += 1
+        return result
+
+    def tag(self, texts):
+        '''
+        :param texts: 任意可迭代对象
+        :return: (文本, 重复的原文本序号或None) 的生成器
+        '''
+        iterator = iter(texts)
+        while True:
+            batch = list(islice(iterator, self._batch_size))
+            if not batch:
+                return
+            yield from zip(batch, self.find_duplicates(batch))
+
+    def filter(self, texts):
+        '''
+        :param texts: 任意可迭代对象
+        :return: 不重复的文本的生成器
+        '''
+        for text, duplicate_of in self.tag(texts):
+            if duplicate_of is None:
+                yield text
+
+    def __call__(self, data, **kwargs):
+        if isinstance(data, str):
+            return '' if self.find_duplicates([data])[0] is not None else data
+        texts = [str(text) for text in data]
+        return ['' if duplicate_of is not None else text
+                for text, duplicate_of in zip(texts, self.find_duplicates(texts))]
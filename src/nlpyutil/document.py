@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+以偏移量表示分词结果的文档：只保存原文和每个词的起止位置，删除词、切分词都只修改偏移量数组，不复制文本
+"""
+
+import numpy as np
+
+from . import char_table
+
+_EMPTY_SPANS = np.zeros((0, 2), dtype=np.int32)
+
+
+class Document(object):
+    '''
+    原文加上 (词数, 2) 的int32偏移量数组，第i个词为 text[spans[i, 0]:spans[i, 1]]。
+    过滤操作返回共享原文的新Document，原对象不变
+    '''
+
+    __slots__ = ('text', 'spans', 'token_ids')
+
+    def __init__(self, text, spans=None, token_ids=None):
+        '''
+        :param text: 原文
+        :param spans: (词数, 2) 的偏移量数组，None表示没有词
+        :param token_ids: 可选的词id数组，长度和词数相同
+        '''
+        self.text = text
+        if spans is None:
+            spans = _EMPTY_SPANS
+        else:
+            spans = np.asarray(spans, dtype=np.int32)
+            if spans.ndim != 2:
+                spans = spans.reshape(-1, 2)
+        self.spans = spans
+        self.token_ids = token_ids
+
+    @classmethod
+    def segment(cls, text, hmm=True):
+        '''
+        用jieba分词构建文档
+        :param text:
+        :param hmm: 是否使用HMM识别未登录词
+        :return:
+        '''
+        import jieba
+        offsets = [offset for _, start, end in jieba.tokenize(text, HMM=hmm) for offset in (start, end)]
+        return cls(text, np.array(offsets, dtype=np.int32))
+
+    @property
+    def starts(self):
+        return self.spans[:, 0]
+
+    @property
+    def ends(self):
+        return self.spans[:, 1]
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __getitem__(self, index):
+        start, end = self.spans[index]
+        return self.text[start:end]
+
+    def __iter__(self):
+        text = self.text
+        for start, end in self.spans.tolist():
+            yield text[start:end]
+
+    def __eq__(self, other):
+        return (isinstance(other, Document) and self.text == other.text
+                and np.array_equal(self.spans, other.spans)
+                and np.array_equal(self.token_ids, other.token_ids))
+
+    def __repr__(self):
+        return 'Document({!r}, tokens={})'.format(self.text, len(self))
+
+    def tokens(self):
+        return list(self)
+
+    def to_text(self, joint=' '):
+        return joint.join(self)
+
+    def select(self, mask):
+        '''
+        :param mask: 每个词是否保留的bool数组
+        :return: 只包含保留的词的新文档
+        '''
+        token_ids = self.token_ids[mask] if self.token_ids is not None else None
+        return Document(self.text, self.spans[mask], token_ids)
+
+    def remove_tokens(self, words):
+        '''
+        删除整个词出现在words中的词，如停用词
+        :param words: 词的set
+        :return:
+        '''
+        if not len(self):
+            return self
+        return self.select(np.fromiter((token not in words for token in self), dtype=bool, count=len(self)))
+
+    def remove_rare(self):
+        '''
+        删除都是生僻字的词
+        :return:
+        '''
+        if not len(self):
+            return self
+        table = char_table.get_table()
+        rare = [all(table[ord(char)] & char_table.RARE for char in token) for token in self]
+        return self.select(~np.array(rare, dtype=bool))
+
+    def remove_chars(self, char_mask):
+        '''
+        从词中删除字符，词被删除的字符切分为多个词，删除后为空的词被丢弃。token_ids 不再对应，结果中不保留
+        :param char_mask: 长度和原文相同的bool数组，True表示删除该字符
+        :return:
+        '''
+        if not len(self):
+            return self
+        size = len(self.text)
+        # 每个字符是否在某个词内，以及是否是一个词的开头或结尾
+        delta = np.zeros(size + 1, dtype=np.int32)
+        np.add.at(delta, self.starts, 1)
+        np.add.at(delta, self.ends, -1)
+        keep = (np.cumsum(delta[:-1]) > 0) & ~np.asarray(char_mask, dtype=bool)
+        token_start = np.zeros(size + 1, dtype=bool)
+        token_start[self.starts] = True
+        token_end = np.zeros(size + 1, dtype=bool)
+        token_end[self.ends] = True
+
+        previous = np.concatenate(([False], keep[:-1]))
+        following = np.concatenate((keep[1:], [False]))
+        starts = np.flatnonzero(keep & (~previous | token_start[:-1]))
+        ends = np.flatnonzero(keep & (~following | token_end[1:])) + 1
+        spans = np.empty((len(starts), 2), dtype=np.int32)
+        spans[:, 0] = starts
+        spans[:, 1] = ends
+        return Document(self.text, spans)
+
+    def remove_flags(self, flags):
+        '''
+        从词中删除属于字符类别表（见char_table）中指定类别的字符
+        :param flags: char_table 中一个或多个flag的按位或
+        :return:
+        '''
+        if not len(self):
+            return self
+        codes = np.frombuffer(self.text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        return self.remove_chars((char_table.as_array()[codes] & flags).astype(bool))
+
+    def remove_spans(self, spans):
+        '''
+        从词中删除落在给定区间内的字符，如 Lexicon.spans 的结果
+        :param spans: [起始位置, 结束位置) 的list
+        :return:
+        '''
+        if not len(self) or not len(spans):
+            return self
+        delta = np.zeros(len(self.text) + 1, dtype=np.int32)
+        spans = np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+        np.add.at(delta, spans[:, 0], 1)
+        np.add.at(delta, spans[:, 1], -1)
+        return self.remove_chars(np.cumsum(delta[:-1]) > 0)
+
+    def encode(self, vocab, unk_id=0):
+        '''
+        :param vocab: 词到id的dict
+        :param unk_id: 不在vocab中的词的id
+        :return: 带有 token_ids 的新文档
+        '''
+        token_ids = np.fromiter((vocab.get(token, unk_id) for token in self), dtype=np.int32, count=len(self))
+        return Document(self.text, self.spans, token_ids)
+
+    def nbytes(self):
+        '''
+        :return: 偏移量和词id占用的字节数，不包括原文
+        '''
+        return self.spans.nbytes + (self.token_ids.nbytes if self.token_ids is not None else 0)
@@ -22,7 +22,6 @@
 # SOFTWARE.
 
 import os
-import psutil
 import platform
 
 
@@ -46,6 +45,7 @@ def is_linux_ready(path):
     :param path:
     :return:
     """
+    import psutil
     for proc in psutil.process_iter():
         try:
             for item in proc.open_files():
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+两级的语言识别：先统计文本中各文字（汉字、假名、谚文、拉丁字母等）的字符数，
+文字分布明确的文本直接判定，只有不确定的文本才交给固定随机种子、复用的 langdetect
+"""
+
+import numpy as np
+
+from . import t2s, vectorized
+
+SCRIPT_NONE = 0  # 数字、标点、空白、符号等不参与判断的字符
+SCRIPT_HAN = 1
+SCRIPT_KANA = 2
+SCRIPT_HANGUL = 3
+SCRIPT_LATIN = 4
+SCRIPT_CYRILLIC = 5
+SCRIPT_OTHER = 6  # 其它文字的字母
+SCRIPT_NAMES = ('none', 'han', 'kana', 'hangul', 'latin', 'cyrillic', 'other')
+
+# (起始码位, 结束码位, 文字)，区间之外的码位都是 SCRIPT_NONE
+_SCRIPT_RANGES = [
+    (0x0041, 0x005a, SCRIPT_LATIN), (0x0061, 0x007a, SCRIPT_LATIN), (0x00c0, 0x024f, SCRIPT_LATIN),
+    (0x0370, 0x03ff, SCRIPT_OTHER), (0x0400, 0x052f, SCRIPT_CYRILLIC), (0x0590, 0x074f, SCRIPT_OTHER),
+    (0x0900, 0x0e7f, SCRIPT_OTHER), (0x1100, 0x11ff, SCRIPT_HANGUL), (0x1e00, 0x1eff, SCRIPT_LATIN),
+    (0x3040, 0x30ff, SCRIPT_KANA), (0x3130, 0x318f, SCRIPT_HANGUL), (0x31f0, 0x31ff, SCRIPT_KANA),
+    (0x3400, 0x4dbf, SCRIPT_HAN), (0x4e00, 0x9fff, SCRIPT_HAN), (0xac00, 0xd7af, SCRIPT_HANGUL),
+    (0xf900, 0xfaff, SCRIPT_HAN), (0xff21, 0xff3a, SCRIPT_LATIN), (0xff41, 0xff5a, SCRIPT_LATIN),
+    (0xff66, 0xff9f, SCRIPT_KANA), (0x20000, 0x2fa1f, SCRIPT_HAN),
+]
+# 查表覆盖的码位范围，更大的码位都是 SCRIPT_NONE
+_LOOKUP_SIZE = 0x30000
+
+_script_lookup = None
+_traditional_lookup = None
+
+
+def _lookups():
+    '''
+    码位到文字的查表数组，以及码位是否是繁体字的查表数组，首次使用时构建
+    :return:
+    '''
+    global _script_lookup, _traditional_lookup
+    if _script_lookup is None:
+        scripts = np.zeros(_LOOKUP_SIZE, dtype=np.uint8)
+        for start, end, script in _SCRIPT_RANGES:
+            scripts[start:end + 1] = script
+        traditional = np.zeros(_LOOKUP_SIZE, dtype=bool)
+        traditional[[ord(char) for char in t2s.traditional_chars() if ord(char) < _LOOKUP_SIZE]] = True
+        _script_lookup, _traditional_lookup = scripts, traditional
+    return _script_lookup, _traditional_lookup
+
+
+def script_histogram(texts):
+    '''
+    批量统计每篇文本中各文字的字符数
+    :param texts: 文本的list
+    :return: ((文本数, len(SCRIPT_NAMES)) 的字符数矩阵, 每篇文本中繁体字的个数)
+    '''
+    scripts, traditional = _lookups()
+    codes, offsets = vectorized.encode_batch(texts)
+    codes = np.minimum(codes, _LOOKUP_SIZE - 1)
+    count = len(offsets) - 1
+    doc_index = np.repeat(np.arange(count), np.diff(offsets))
+    histogram = np.bincount(doc_index * len(SCRIPT_NAMES) + scripts[codes],
+                            minlength=count * len(SCRIPT_NAMES)).reshape(count, len(SCRIPT_NAMES))
+    traditional_counts = np.bincount(doc_index[traditional[codes]], minlength=count)
+    return histogram, traditional_counts
+
+
+class LanguageIdentifier(object):
+    '''
+    语言识别，返回值和 langdetect 的语言代码一致，无法识别时返回None
+    '''
+
+    def __init__(self, seed=0, min_share=0.5, kana_share=0.2):
+        '''
+        :param seed: langdetect 的随机种子，固定后结果可以复现
+        :param min_share: 汉字或者谚文占所有字母的比例不低于此值时直接判定为中文或者韩文
+        :param kana_share: 假名占所有字母的比例不低于此值时直接判定为日文
+        '''
+        self.seed = seed
+        self.min_share = min_share
+        self.kana_share = kana_share
+        self._factory = None
+
+    def __getstate__(self):
+        # langdetect的语言模型较大，子进程中重新加载
+        state = self.__dict__.copy()
+        state['_factory'] = None
+        return state
+
+    def detect(self, text):
+        return self.detect_batch([text])[0]
+
+    def detect_batch(self, texts):
+        '''
+        :param texts: 文本的list
+        :return: 每篇文本的语言代码
+        '''
+        texts = [text if isinstance(text, str) else str(text) for text in texts]
+        histogram, traditional_counts = script_histogram(texts)
+        return [self._decide(counts, traditional) or self._fallback(text)
+                for text, counts, traditional in zip(texts, histogram.tolist(), traditional_counts.tolist())]
+
+    def is_language(self, text, language):
+        return self.is_language_batch([text], language)[0]
+
+    def is_language_batch(self, texts, language):
+        '''
+        判断文本是否是指定的语言，不包含该语言所用文字的文本直接判定为否，不需要 langdetect
+        :param texts: 文本的list
+        :param language: langdetect 的语言代码，如 zh-cn
+        :return: bool的list
+        '''
+        texts = [text if isinstance(text, str) else str(text) for text in texts]
+        histogram, traditional_counts = script_histogram(texts)
+        required = _REQUIRED_SCRIPTS.get(language)
+        result = []
+        for text, counts, traditional in zip(texts, histogram.tolist(), traditional_counts.tolist()):
+            if required and not any(counts[script] for script in required):
+                result.append(False)
+            else:
+                result.append((self._decide(counts, traditional) or self._fallback(text)) == language)
+        return result
+
+    def _decide(self, counts, traditional):
+        '''
+        根据文字分布判定语言
+        :param counts: 各文字的字符数
+        :param traditional: 繁体字的个数
+        :return: 语言代码，不能确定时返回None
+        '''
+        letters = sum(counts) - counts[SCRIPT_NONE]
+        if not letters:
+            return None
+        han, kana, hangul = counts[SCRIPT_HAN], counts[SCRIPT_KANA], counts[SCRIPT_HANGUL]
+        if kana >= self.kana_share * letters and not hangul:
+            return 'ja'
+        if hangul >= self.min_share * letters and not kana:
+            return 'ko'
+        if han >= self.min_share * letters and not kana and not hangul and not traditional:
+            return 'zh-cn'
+        return None
+
+    def _fallback(self, text):
+        '''
+        使用 langdetect 识别，文本中没有可用的特征时返回None
+        :param text:
+        :return:
+        '''
+        from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+        from langdetect.lang_detect_exception import LangDetectException
+        if self._factory is None:
+            factory = DetectorFactory()
+            factory.load_profile(PROFILES_DIRECTORY)
+            factory.set_seed(self.seed)
+            self._factory = factory
+        detector = self._factory.create()
+        detector.append(text)
+        try:
+            return detector.detect()
+        except LangDetectException:
+            return None
+
+
+# 各语言必须包含的文字，不包含其中任何一种的文本一定不是该语言
+_REQUIRED_SCRIPTS = {
+    'zh-cn': (SCRIPT_HAN,),
+    'zh-tw': (SCRIPT_HAN,),
+    'ja': (SCRIPT_HAN, SCRIPT_KANA),
+    'ko': (SCRIPT_HANGUL, SCRIPT_HAN),
+}
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+基于Aho-Corasick自动机的词表匹配：一次线性扫描找出原始文本中词表里所有词的出现位置，
+不依赖分词的结果，可以匹配多字的短语，也可以在分词前过滤停用词和短语黑名单
+"""
+
+import hashlib
+from collections import deque
+
+from . import rarewords, stopwords
+
+
+class Lexicon(object):
+    '''
+    词表编译成的Aho-Corasick自动机。添加词之后在下一次匹配时重新编译
+    '''
+
+    def __init__(self, words=()):
+        '''
+        :param words: 词的可迭代对象，空字符串会被忽略
+        '''
+        self._words = set()
+        self._compiled = False
+        self.add_words(words)
+
+    @classmethod
+    def default(cls):
+        '''
+        由停用词和生僻字构成的词表
+        :return:
+        '''
+        global _default_lexicon
+        if _default_lexicon is None:
+            _default_lexicon = cls(stopwords.STOPWORDS)
+            _default_lexicon.add_words(rarewords.RAREWORDS)
+        return _default_lexicon
+
+    @classmethod
+    def from_file(cls, path, encoding='utf-8'):
+        '''
+        :param path: 词表文件，每行一个词
+        :param encoding:
+        :return:
+        '''
+        with open(path, 'r', encoding=encoding) as file:
+            return cls(line.rstrip('\r\n') for line in file)
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word):
+        return word in self._words
+
+    def fingerprint(self):
+        '''
+        :return: 词表内容的哈希，用于 ResultCache 区分不同词表的pipeline
+        '''
+        digest = hashlib.blake2b(digest_size=16)
+        for word in sorted(self._words):
+            digest.update(word.encode('utf-8', 'surrogatepass'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def add_words(self, words):
+        for word in words:
+            if word:
+                self._words.add(str(word))
+        self._compiled = False
+
+    def _compile(self):
+        '''
+        构建trie和失败指针，每个状态记录以它结尾的所有词的长度
+        :return:
+        '''
+        goto = [{}]
+        lengths = [()]
+        for word in sorted(self._words):
+            state = 0
+            for char in word:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    lengths.append(())
+                state = next_state
+            lengths[state] = (len(word),)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                # 通过失败指针能到达的状态对应的词都是当前词的后缀，同样在这里结束
+                lengths[next_state] = lengths[next_state] + lengths[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._lengths = lengths
+        self._longest = [max(item) if item else 0 for item in lengths]
+        self._compiled = True
+
+    def _scan(self, text, all_matches):
+        '''
+        :param text:
+        :param all_matches: True时返回所有匹配的长度，False时只返回最长的长度
+        :return: (结束位置, 匹配长度的tuple或最长长度) 的生成器
+        '''
+        if not self._compiled:
+            self._compile()
+        goto, fail = self._goto, self._fail
+        outputs = self._lengths if all_matches else self._longest
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                yield end, outputs[state]
+
+    def find_all(self, text):
+        '''
+        找出所有词的所有出现位置，包括相互重叠的
+        :param text:
+        :return: (起始位置, 结束位置, 词) 的list，按结束位置排序，结束位置相同时长的在前
+        '''
+        return [(end - length, end, text[end - length:end])
+                for end, lengths in self._scan(text, True) for length in lengths]
+
+    def contains_any(self, text):
+        '''
+        文本中是否出现了词表中的任意一个词
+        :param text:
+        :return:
+        '''
+        for _ in self._scan(text, False):
+            return True
+        return False
+
+    def spans(self, text):
+        '''
+        所有出现位置合并后的区间
+        :param text:
+        :return: 互不重叠的 [起始位置, 结束位置) 的list
+        '''
+        merged = []
+        for end, length in self._scan(text, False):
+            start = end - length
+            # 结束位置递增，新的区间可能覆盖之前的多个区间
+            while merged and merged[-1][0] >= start:
+                merged.pop()
+            if merged and merged[-1][1] >= start:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        return merged
+
+    def remove(self, text, repl=''):
+        '''
+        删除文本中所有出现的词，相互重叠或相邻的出现合并后替换为一个repl
+        :param text:
+        :param repl: 替换成的字符串，分词前过滤时使用空格可以避免删除后两侧的字符被分到同一个词中
+        :return:
+        '''
+        pieces = []
+        last = 0
+        for start, end in self.spans(text):
+            pieces.append(text[last:start])
+            pieces.append(repl)
+            last = end
+        if not pieces:
+            return text
+        pieces.append(text[last:])
+        return ''.join(pieces)
+
+    def __call__(self, data, **kwargs):
+        '''
+        作为PreprocessPipeline中的处理函数使用，删除所有出现的词
+        :param data: 单条文本或文本的list
+        :param kwargs: 吸收不相关参数
+        :return:
+        '''
+        if not data:
+            return data
+        if isinstance(data, str):
+            return self.remove(data)
+        return [self.remove(str(text)) for text in data]
+
+
+_default_lexicon = None
@@ -22,10 +22,9 @@
 # SOFTWARE.
 
 import json
+import sys
 import threading
 
-import pandas as pd
-
 
 class LocalizeThread(threading.Thread):
     '''
@@ -44,7 +43,9 @@ class LocalizeThread(threading.Thread):
         self.sep = sep
 
     def run(self):
-        if isinstance(self.data, pd.DataFrame) or isinstance(self.data, pd.Series):
+        # pandas没有被导入时数据不可能是DataFrame，不需要为了类型判断导入pandas
+        pd = sys.modules.get('pandas')
+        if pd is not None and (isinstance(self.data, pd.DataFrame) or isinstance(self.data, pd.Series)):
             # DataFrame 或者Series直接调用其to_csv方法
             if self.columns:
                 self.data.to_csv(self.file_path, encoding="utf-8", index=False, sep=self.sep, columns=self.columns)
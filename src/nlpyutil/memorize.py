@@ -23,57 +23,89 @@
 
 import hashlib
 import pickle
+import threading
 import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# 缓存满了之后的淘汰策略
+POLICY_LRU = 'lru'
+POLICY_LFU = 'lfu'
+# 参数key中分隔位置参数和关键字参数，标记序列化得到的key，以及表示没有缓存
+_KWARGS_MARK = object()
+_PICKLE_MARK = object()
+_MISSING = object()
+# 单个参数是这些类型时，直接用参数本身作为key
+_FAST_TYPES = {int, str}
+# 按值哈希的内置类型。其它类型的参数（包括实例方法的self）默认按对象身份哈希，
+# 需要序列化后作为key，对象的属性变化后不会命中旧的结果
+_VALUE_TYPES = {int, str, bytes, float, bool, type(None)}
 
 
 class memoize(object):
     '''
-    缓存类, 缓存函数的执行结果，类中的方法不建议加
+    缓存类, 缓存函数的执行结果，类中的方法不建议加。
+    每个被装饰的函数有自己的缓存，被装饰后的函数提供 cache_clear() 和 cache_info()。
+    参数都是数字、字符串、bytes、None以及由它们组成的tuple和frozenset时，直接用参数组成的tuple和参数的类型作为key，
+    相等的不同类型参数（例如 1，1.0 和 True）分开缓存，typed为False时和 functools.lru_cache 一样共用一个结果；
+    有其它类型的参数时序列化参数并计算哈希，和对象的状态有关
     '''
 
-    def __init__(self, duration=None, is_log=False):
+    def __init__(self, duration=None, is_log=False, maxsize=None, policy=POLICY_LRU, typed=True):
         '''
         如果没有加时间，表示程序生命周期内一直保存，对于全生命周期的结果可以这样做
-        :param duration: 缓存时间
+        :param duration: 缓存时间（秒），过期的结果会从缓存中删除
         :param is_log: 是否打印日志，如果是类中函数建议不打印日志，如果频繁调用也不建议打印日志
+        :param maxsize: 最多缓存的结果数，None表示不限制
+        :param policy: 超过maxsize时的淘汰策略，lru：淘汰最久没有使用的；lfu：淘汰使用次数最少的
+        :param typed: 为True时不同类型的参数分开缓存，例如 1 和 1.0，为False时相等的参数共用一个结果
         '''
-        self.__cache = {}
+        if maxsize is not None and maxsize < 1:
+            raise ValueError('maxsize must be positive or None: {}'.format(maxsize))
+        if policy not in (POLICY_LRU, POLICY_LFU):
+            raise ValueError('unsupported cache policy: {}'.format(policy))
         self.__duration = duration
         self.__is_log = is_log
+        self.__maxsize = maxsize
+        self.__policy = policy
+        self.__typed = typed
 
     def __call__(self, func):
+        cache = _CacheStore(self.__maxsize, self.__policy, self.__duration)
+        # 命中缓存时的开销主要在属性查找上，提前绑定为局部变量
+        get = cache.get
+        typed = self.__typed
+        is_log = self.__is_log
+
+        @wraps(func)
         def __memorize(*args, **kwargs):
-            key = self.__compute_key(func, args, kwargs)
-            if key in self.__cache and not self.__is_obsolete(self.__cache[key]):
-                if self.__is_log:
+            try:
+                key = _make_key(args, kwargs, typed)
+            except TypeError:
+                # 参数中有不是按值哈希的对象
+                key = (_PICKLE_MARK, self.__compute_key(func, args, kwargs))
+            found, value = get(key)
+            if found:
+                if is_log:
                     print('fit the cache of function: {}, with args: {} and kwargs: {}'.format(func.__name__,
                                                                                                args,
                                                                                                kwargs))
                 # 如果缓存中有，就直接返回缓存过的结果
-                return self.__cache[key]['value']
+                return value
             result = func(*args, **kwargs)
-            self.__cache[key] = {'value': result, 'time': time.time()}
+            cache.set(key, result)
 
             return result
 
+        __memorize.cache_clear = cache.clear
+        __memorize.cache_info = cache.info
         return __memorize
 
-    def __is_obsolete(self, entry):
-        '''
-        判断缓存是否过期，返回True则过期
-        :param entry:
-        :param duration:
-        :return:
-        '''
-        if self.__duration is None:
-            return False
-        diff = time.time() - entry['time']
-
-        return diff > self.__duration
-
     def __compute_key(self, function, args, kwargs):
         '''
-        将传入的参数序列化
+        将传入的参数序列化，参数不能哈希时使用
         :param function:
         :param args:
         :param kwargs:
@@ -82,3 +114,164 @@ class memoize(object):
         # 实例方法中使用时，实例对象会作为args[0] 传递过来
         key = pickle.dumps((function.__name__, args, kwargs))
         return hashlib.sha1(key).hexdigest()
+
+
+def _make_key(args, kwargs, typed):
+    '''
+    由参数组成的key，和 functools 中的 _make_key 相同
+    :param args:
+    :param kwargs:
+    :param typed:
+    :return:
+    :raise TypeError: 有不是按值哈希的参数时，调用方改用序列化的key
+    '''
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK,)
+        for item in kwargs.items():
+            key += item
+    # 类型为int或str本身的参数和其它类型的参数组成的tuple不会相等，typed为True时也可以直接作为key
+    if len(key) == 1 and type(key[0]) in _FAST_TYPES:
+        return key[0]
+    if not all(_is_value(value) for value in args) or (kwargs and not all(_is_value(value) for value in kwargs.values())):
+        raise TypeError('arguments are not hashed by value')
+    if typed:
+        key += tuple(type(value) for value in args)
+        if kwargs:
+            key += tuple(type(value) for value in kwargs.values())
+    return key
+
+
+def _is_value(value):
+    kind = type(value)
+    if kind in _VALUE_TYPES:
+        return True
+    if kind is tuple or kind is frozenset:
+        return all(_is_value(item) for item in value)
+    return False
+
+
+class _CacheStore(object):
+    '''
+    单个函数的缓存。超过maxsize时按LRU或LFU淘汰，设置了有效期时，
+    每次访问都会先删除已经过期的结果，过期时间和写入顺序一致，删除的均摊开销为O(1)
+    '''
+
+    def __init__(self, maxsize=None, policy=POLICY_LRU, duration=None):
+        self._maxsize = maxsize
+        self._policy = policy
+        self._duration = duration
+        # 不限制大小也没有有效期时，和 functools.lru_cache 一样只有字典的读写，读取时不需要加锁
+        self._simple = maxsize is None and duration is None
+        self._lock = threading.Lock()
+        self._init_state()
+
+    def _init_state(self):
+        # LRU时按最近使用的顺序排列
+        self._values = OrderedDict()
+        # key到过期时间，按写入的顺序排列
+        self._deadlines = OrderedDict()
+        # LFU：key到使用次数，使用次数到同样次数的key，以及最小的使用次数
+        self._counts = {}
+        self._buckets = {}
+        self._min_count = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        '''
+        :param key:
+        :return: (是否命中, 缓存的值)
+        '''
+        if self._simple:
+            value = self._values.get(key, _MISSING)
+            if value is _MISSING:
+                self._misses += 1
+                return False, None
+            self._hits += 1
+            return True, value
+        with self._lock:
+            if self._deadlines:
+                self._expire()
+            value = self._values.get(key, _MISSING)
+            if value is _MISSING:
+                self._misses += 1
+                return False, None
+            self._hits += 1
+            # 不限制大小时不会淘汰，不需要维护使用顺序和次数
+            if self._maxsize is not None:
+                if self._policy == POLICY_LFU:
+                    self._increase_count(key)
+                else:
+                    self._values.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._values:
+                # 多个线程同时计算了同一个key
+                self._values[key] = value
+                self._values.move_to_end(key)
+            else:
+                if self._maxsize is not None and len(self._values) >= self._maxsize:
+                    self._evict()
+                self._values[key] = value
+                if self._policy == POLICY_LFU:
+                    self._counts[key] = 1
+                    self._buckets.setdefault(1, OrderedDict())[key] = None
+                    self._min_count = 1
+            if self._duration is not None:
+                self._deadlines[key] = time.monotonic() + self._duration
+                self._deadlines.move_to_end(key)
+
+    def clear(self):
+        '''
+        清空缓存和统计信息
+        :return:
+        '''
+        with self._lock:
+            self._init_state()
+
+    def info(self):
+        with self._lock:
+            if self._deadlines:
+                self._expire()
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._values))
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._deadlines:
+            key, deadline = next(iter(self._deadlines.items()))
+            if deadline > now:
+                break
+            self._remove(key)
+
+    def _evict(self):
+        if self._policy == POLICY_LFU:
+            if self._min_count not in self._buckets:
+                self._min_count = min(self._buckets)
+            key = next(iter(self._buckets[self._min_count]))
+        else:
+            key = next(iter(self._values))
+        self._remove(key)
+
+    def _remove(self, key):
+        del self._values[key]
+        self._deadlines.pop(key, None)
+        if self._policy == POLICY_LFU:
+            count = self._counts.pop(key)
+            bucket = self._buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[count]
+
+    def _increase_count(self, key):
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import threading
+
+# 使用线程池时多个批次会同时记录统计信息
+_record_lock = threading.Lock()
+
+
+class StageStats(object):
+    '''
+    pipeline中单个处理函数的统计信息
+    '''
+
+    __slots__ = ('name', 'calls', 'docs', 'total_time', 'chars_in', 'chars_out')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.docs = 0
+        self.total_time = 0.0
+        self.chars_in = 0
+        self.chars_out = 0
+
+    def record(self, elapsed, docs, chars_in, chars_out):
+        '''
+        记录一次调用
+        :param elapsed: 耗时（秒）
+        :param docs: 本次调用处理的文档数
+        :param chars_in: 输入的字符数
+        :param chars_out: 输出的字符数
+        :return:
+        '''
+        with _record_lock:
+            self.calls += 1
+            self.docs += docs
+            self.total_time += elapsed
+            self.chars_in += chars_in
+            self.chars_out += chars_out
+
+    def merge(self, other):
+        with _record_lock:
+            self.calls += other.calls
+            self.docs += other.docs
+            self.total_time += other.total_time
+            self.chars_in += other.chars_in
+            self.chars_out += other.chars_out
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.calls if self.calls else 0.0
+
+    @property
+    def docs_per_sec(self):
+        return self.docs / self.total_time if self.total_time else 0.0
+
+    @property
+    def chars_per_sec(self):
+        return self.chars_in / self.total_time if self.total_time else 0.0
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'docs': self.docs,
+            'total_time': self.total_time,
+            'mean_time': self.mean_time,
+            'docs_per_sec': self.docs_per_sec,
+            'chars_per_sec': self.chars_per_sec,
+            'chars_in': self.chars_in,
+            'chars_out': self.chars_out
+        }
+
+
+class PipelineStats(object):
+    '''
+    PreprocessPipeline 每个处理函数的统计信息，顺序和pipeline中的函数顺序一致
+    '''
+
+    def __init__(self, names):
+        self.stages = [StageStats(name) for name in names]
+
+    def __getitem__(self, item):
+        return self.stages[item]
+
+    def __iter__(self):
+        return iter(self.stages)
+
+    def __len__(self):
+        return len(self.stages)
+
+    def empty_copy(self):
+        return PipelineStats([stage.name for stage in self.stages])
+
+    def merge(self, other):
+        for stage, other_stage in zip(self.stages, other.stages):
+            stage.merge(other_stage)
+
+    @property
+    def total_time(self):
+        return sum(stage.total_time for stage in self.stages)
+
+    def to_dict(self):
+        return {
+            'total_time': self.total_time,
+            'stages': [stage.to_dict() for stage in self.stages]
+        }
+
+    def to_json(self, **kwargs):
+        '''
+        :param kwargs: 传入 json.dumps 的参数
+        :return:
+        '''
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def to_prometheus(self, prefix='nlpyutil_pipeline'):
+        '''
+        导出为Prometheus的文本格式
+        :param prefix: 指标名前缀
+        :return:
+        '''
+        metrics = [
+            ('calls_total', 'counter', 'Number of calls of each stage.', 'calls'),
+            ('docs_total', 'counter', 'Number of documents processed by each stage.', 'docs'),
+            ('seconds_total', 'counter', 'Time spent in each stage in seconds.', 'total_time'),
+            ('chars_in_total', 'counter', 'Number of characters fed into each stage.', 'chars_in'),
+            ('chars_out_total', 'counter', 'Number of characters produced by each stage.', 'chars_out'),
+        ]
+        lines = []
+        for suffix, metric_type, description, attr in metrics:
+            name = '{}_{}'.format(prefix, suffix)
+            lines.append('# HELP {} {}'.format(name, description))
+            lines.append('# TYPE {} {}'.format(name, metric_type))
+            for index, stage in enumerate(self.stages):
+                lines.append('{}{{stage="{}",index="{}"}} {}'.format(name, _escape_label(stage.name), index,
+                                                                      getattr(stage, attr)))
+        return '\n'.join(lines) + '\n'
+
+
+def count_chars(data):
+    '''
+    统计单条文本或者文本list的字符数
+    :param data:
+    :return: (文档数, 字符数)
+    '''
+    if isinstance(data, str):
+        return 1, len(data)
+    if isinstance(data, (list, tuple)):
+        return len(data), sum(len(text) for text in data if isinstance(text, str))
+    return 0, 0
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
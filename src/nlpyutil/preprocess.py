@@ -4,17 +4,26 @@
 # Email:        wangkun6536@163.com
 # Desc:         公用的一些预处理方法
 
+import multiprocessing
 import re
 import string
-from collections import Iterable
-from functools import wraps
+import time
+from collections import deque
+from collections.abc import Iterable
+from itertools import islice
+from functools import lru_cache, partial, wraps
 
-import jieba
-import langdetect
+import numpy as np
 import unicodedata
-from opencc import OpenCC
 
-from . import ch_utils
+from . import ch_utils, char_table, tokenizer_cache
+from .document import Document
+from .langid import LanguageIdentifier
+from .pipeline_stats import PipelineStats, count_chars
+from .result_cache import pipeline_fingerprint
+from .substitution import SubstitutionProgram
+from .t2s import T2SConverter
+from .weibo import WeiboParser
 from . import rarewords
 from . import stopwords
 from . import usual_pattern
@@ -23,8 +32,21 @@ _STOP_WORDS = stopwords.STOPWORDS
 _STOP_WORDS.extend(rarewords.RAREWORDS)
 # set 有助于提升速度
 _STOP_WORDS = set(_STOP_WORDS)
-_RARE_WORDS = set(rarewords.RAREWORDS)
-_t2s = OpenCC('t2s')
+_t2s = T2SConverter()
+_language_identifier = LanguageIdentifier()
+# 删除所有可打印ascii字符的转换表
+_PRINTABLE_DELETE_TABLE = {ord(char): None for char in string.printable}
+# preprocess_clean_text 使用的替换程序，按替换字符缓存
+_CLEAN_TEXT_PROGRAMS = {}
+# segment_batch 的输出格式
+SEGMENT_TOKENS = 'tokens'
+SEGMENT_TEXT = 'text'
+SEGMENT_FLAT = 'flat'
+SEGMENT_DOCUMENT = 'document'
+# preprocess_remove_duplacte_words 处理长文本时默认的重复单元最大长度
+DUPLICATE_UNIT_MAX_LEN = 32
+# 不短于此长度的文本先找出可能重复的位置再匹配
+_DUPLICATE_SCAN_MIN_LEN = 512
 
 
 def process_iter(func):
@@ -58,6 +80,9 @@ class PreprocessPipeline(object):
     使用此pipeline时的注意事项：
       1. func_list 中添加的函数第一个参数是需要处理的数据，其它参数必须是key=value，也就是**kwargs
       2. func_list 中添加的函数输出输出据必须要和输入数据格式，类型相同
+      3. 使用多进程（workers > 1）时，func_list 中的函数必须可以被pickle，即不能是lambda或者局部函数
+      4. 流式处理时每篇文档依次经过所有处理函数，batched 属性为True的处理函数（如 NearDuplicateFilter）
+         例外，每次收到整批文档的list
     """
 
     def __init__(self, func_list, **kwargs):
@@ -68,15 +93,248 @@ class PreprocessPipeline(object):
         self._func_list = func_list
         self._check_params()
         self._kwargs = kwargs
+        self._async_processor = None
+        self._stats = None
+        self._cache = None
+        self._fingerprint = None
+        self._warmup_options = {}
+
+    def __getstate__(self):
+        # 事件循环相关的对象不能也不需要传递给子进程
+        state = self.__dict__.copy()
+        state['_async_processor'] = None
+        return state
 
     def _check_params(self):
         pass
 
-    def process(self, data):
+    def enable_stats(self, enabled=True):
+        """
+        开启或关闭每个处理函数的耗时、吞吐量统计，重新开启时会清空之前的统计
+        :param enabled:
+        :return:
+        """
+        if enabled:
+            self._stats = PipelineStats([getattr(func, '__name__', repr(func)) for func in self._func_list])
+        else:
+            self._stats = None
+
+    @property
+    def stats(self):
+        """
+        :return: PipelineStats，未开启统计时为None
+        """
+        return self._stats
+
+    def set_cache(self, cache):
+        """
+        设置处理结果的缓存，相同的文本只会处理一次。缓存按单条文本生效，
+        设置缓存后 process 处理list时也会逐条处理
+        :param cache: ResultCache，None表示不使用缓存
+        :return:
+        """
+        self._cache = cache
+        self._fingerprint = pipeline_fingerprint(self._func_list, self._kwargs) if cache is not None else None
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def set_tokenizer(self, user_dicts=(), cache_dir=None):
+        """
+        设置分词器的用户词典和缓存目录，并行处理时父进程和每个worker用这些参数调用 warmup
+        :param user_dicts: jieba用户词典文件路径的list
+        :param cache_dir: 分词器缓存目录，默认为 ~/.cache/nlpyutil
+        :return:
+        """
+        self._warmup_options = {'user_dicts': tuple(user_dicts), 'cache_dir': cache_dir}
+
+    def process(self, data, workers=None, chunksize=100):
+        """
+        :param data: 需要处理的数据
+        :param workers: 进程数，大于1时使用进程池并行处理，返回结果的list
+        :param chunksize: 并行处理时每个任务包含的文档数
+        :return:
+        """
+        if workers and workers > 1 and not isinstance(data, str):
+            return list(self.process_stream(data, workers=workers, chunksize=chunksize))
+        if self._cache is not None and data:
+            result = self._process_one(data) if isinstance(data, str) else self._process_batch(data)
+            self._cache.flush()
+            return result
+        if self._stats is not None:
+            for index, func in enumerate(self._func_list):
+                data = self._run_stage_with_stats(index, func, data)
+            return data
         for func in self._func_list:
             data = func(data, **self._kwargs)
         return data
 
+    def process_stream(self, data, batch_size=1000, workers=None, chunksize=100):
+        """
+        流式处理：每篇文档依次经过所有处理函数后再处理下一篇，结果以生成器的形式惰性返回，
+        峰值内存只和batch_size相关，而与语料大小无关
+        :param data: 单条文本，或者任意可迭代对象（list，生成器，文件对象等）
+        :param batch_size: 每批次处理的文档数
+        :param workers: 进程数，大于1时使用进程池并行处理，此时每批次的文档数为chunksize
+        :param chunksize: 并行处理时每个任务包含的文档数
+        :return: 处理结果的生成器，顺序和输入一致
+        """
+        if isinstance(data, str):
+            data = [data]
+        if workers and workers > 1:
+            yield from self._process_parallel(data, workers, chunksize)
+        else:
+            for batch in _iter_batches(data, batch_size):
+                yield from self._process_batch(batch)
+        if self._cache is not None:
+            self._cache.flush()
+
+    async def aprocess(self, data, executor=None):
+        """
+        在asyncio中使用的异步处理接口，处理过程在executor中执行，不会阻塞事件循环，
+        并发的请求会被合并成小批次处理。需要调整并发数和批次大小时直接使用 AsyncPreprocessor
+        :param data: 单条文本或者文本的list
+        :param executor: 执行处理的executor，None表示使用事件循环默认的线程池
+        :return:
+        """
+        from .async_pipeline import AsyncPreprocessor
+        if self._async_processor is None or self._async_processor.executor is not executor:
+            self._async_processor = AsyncPreprocessor(self, executor=executor)
+        return await self._async_processor.aprocess(data)
+
+    def _process_parallel(self, data, workers, chunksize):
+        """
+        进程池并行处理，每个进程只初始化一次pipeline和分词等资源，
+        同时最多有 workers * 2 个任务在执行，保证内存占用有上限
+        :param data:
+        :param workers:
+        :param chunksize:
+        :return:
+        """
+        max_pending = workers * 2
+        # 在父进程中完成初始化，fork出的worker直接共享，spawn启动的worker从磁盘缓存加载
+        warmup(**self._warmup_options)
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            pending = deque()
+            for batch in _iter_batches(data, chunksize):
+                pending.append(pool.apply_async(_worker_process_batch, (batch,)))
+                if len(pending) >= max_pending:
+                    yield from self._collect_worker_result(pending.popleft())
+            while pending:
+                yield from self._collect_worker_result(pending.popleft())
+
+    def _collect_worker_result(self, async_result):
+        results, stats = async_result.get()
+        if stats is not None and self._stats is not None:
+            self._stats.merge(stats)
+        return results
+
+    def _process_batch(self, batch):
+        if self._cache is None and any(getattr(func, 'batched', False) for func in self._func_list):
+            return self._run_stages_batched([str(text) for text in batch])
+        return [self._process_one(text) for text in batch]
+
+    def _run_stages_batched(self, batch):
+        """
+        按处理函数逐个处理整批文档，batched 的处理函数一次处理整个list，其它处理函数仍然逐篇调用
+        :param batch:
+        :return:
+        """
+        for index, func in enumerate(self._func_list):
+            if self._stats is not None:
+                run = partial(self._run_stage_with_stats, index, func)
+            else:
+                run = partial(func, **self._kwargs)
+            batch = run(batch) if getattr(func, 'batched', False) else [run(text) for text in batch]
+        return batch
+
+    def _process_one(self, text):
+        text = str(text)
+        if self._cache is not None:
+            key = self._cache.make_key(self._fingerprint, text)
+            found, result = self._cache.get(key)
+            if not found:
+                result = self._run_stages(text)
+                self._cache.set(key, result)
+            return result
+        return self._run_stages(text)
+
+    def _run_stages(self, text):
+        if self._stats is not None:
+            for index, func in enumerate(self._func_list):
+                text = self._run_stage_with_stats(index, func, text)
+            return text
+        for func in self._func_list:
+            text = func(text, **self._kwargs)
+        return text
+
+    def _run_stage_with_stats(self, index, func, data):
+        docs, chars_in = count_chars(data)
+        start = time.perf_counter()
+        data = func(data, **self._kwargs)
+        elapsed = time.perf_counter() - start
+        self._stats[index].record(elapsed, docs, chars_in, count_chars(data)[1])
+        return data
+
+
+# 进程池中每个worker进程持有的pipeline
+_worker_pipeline = None
+
+
+def _init_worker(pipeline):
+    """
+    进程池中每个worker启动时调用一次
+    :param pipeline:
+    :return:
+    """
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+    if pipeline._stats is not None:
+        # 子进程只统计自己处理的部分，由主进程合并
+        pipeline._stats = pipeline._stats.empty_copy()
+    warmup(**pipeline._warmup_options)
+
+
+def warmup(user_dicts=(), cache_dir=None):
+    """
+    提前完成耗时的初始化：jieba前缀词典的构建（优先从磁盘缓存加载），字符类别表和繁简转换字典的加载，
+    停用词在模块导入时已经加载。已经初始化过时直接返回
+    :param user_dicts: jieba用户词典文件路径的list
+    :param cache_dir: 分词器缓存目录，默认为 ~/.cache/nlpyutil
+    :return:
+    """
+    tokenizer_cache.load_tokenizer(user_dicts=user_dicts, cache_dir=cache_dir)
+    char_table.get_table()
+    _t2s.load()
+
+
+def _worker_process_batch(batch):
+    results = _worker_pipeline._process_batch(batch)
+    if _worker_pipeline._cache is not None:
+        _worker_pipeline._cache.flush()
+    stats = _worker_pipeline._stats
+    if stats is not None:
+        _worker_pipeline._stats = stats.empty_copy()
+    return results, stats
+
+
+def _iter_batches(data, batch_size):
+    """
+    将可迭代对象按batch_size切分为多个list
+    :param data:
+    :param batch_size:
+    :return:
+    """
+    if batch_size < 1:
+        raise ValueError('batch_size must be positive, got {}'.format(batch_size))
+    iterator = iter(data)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
 
 def get_stopwords():
     return _STOP_WORDS
@@ -100,7 +358,7 @@ def preprocess_remove_en_chars(data: str, **kwargs):
     :param text:
     :return:
     '''
-    return ''.join(filter(lambda x: x not in string.printable, data))
+    return data.translate(_PRINTABLE_DELETE_TABLE)
 
 
 @process_iter
@@ -138,15 +396,21 @@ def preprocess_text_to_dbc(data: str, **kwargs):
     return ch_utils.str_to_dbc(data)
 
 
-@process_iter
 def preprocess_text_to_simple(data: str, **kwargs):
     '''
-    数据繁体转简体
+    数据繁体转简体，已经是简体的文本直接返回，list会批量转换
     :param data:
     :param kwargs 吸收不相关参数
     :return:
     '''
-    return _t2s.convert(data)
+    if not data:
+        return data
+    elif isinstance(data, str):
+        return _t2s.convert(data)
+    elif isinstance(data, Iterable):
+        return _t2s.convert_batch(list(data))
+    else:
+        raise ValueError('parameter:{} can not convert_pipeline'.format(type(data)))
 
 
 @process_iter
@@ -163,13 +427,7 @@ def preprocess_strip_accents(data: str, **kwargs):
     :return:
     """
     data = unicodedata.normalize("NFD", data)
-    output = []
-    for char in data:
-        cat = unicodedata.category(char)
-        if cat == "Mn":
-            continue
-        output.append(char)
-    return "".join(output)
+    return data.translate(ch_utils.category_table(("Mn",)))
 
 
 @process_iter
@@ -180,29 +438,7 @@ def preprocess_split_on_punc(data: str, **kwargs):
     :param kwargs:
     :return:
     """
-
-    def _is_punctuation(char):
-        """检查一个字符是否是标点符号"""
-        cp = ord(char)
-        #  ASCII码中，不是数字和字母外的其它字符都算作标点符号
-        if ((cp >= 33 and cp <= 47) or (cp >= 58 and cp <= 64) or
-                (cp >= 91 and cp <= 96) or (cp >= 123 and cp <= 126)):
-            return True
-        # unicode编码中其它的标点符号
-        cat = unicodedata.category(char)
-        if cat.startswith("P"):
-            return True
-        return False
-
-    res_tokens = []
-    for char in data:
-        if _is_punctuation(char):
-            res_tokens.append(" ")
-        else:
-            res_tokens.append(char)
-    res_str = ''.join(res_tokens)
-
-    return res_str
+    return data.translate(ch_utils.punctuation_table(" "))
 
 
 @process_iter
@@ -211,6 +447,7 @@ def preprocess_text_segmentation(data: str,
                                  remove_stopwords=True,
                                  remove_punc=True,
                                  remove_rare=True,
+                                 lexicon=None,
                                  **kwargs):
     '''
     句子分词
@@ -220,23 +457,36 @@ def preprocess_text_segmentation(data: str,
     :param remove_stopwords: 是否移除停用词
     :param remove_punc: 是否移除标点符号
     :param remove_rare: 是否移除都是生僻字的词
+    :param lexicon: 分词前过滤的词表（Lexicon），文本中出现的词表中的词和短语被替换为空格，不受分词边界的影响
     :param kwargs 吸收不相关参数
     :return:
     '''
+    return joint.join(_segment_terms(data, remove_stopwords, remove_punc, remove_rare, lexicon))
+
+
+def _segment_terms(data, remove_stopwords=True, remove_punc=True, remove_rare=True, lexicon=None, **kwargs):
+    '''
+    分词并过滤，参数见 preprocess_text_segmentation
+    :return: 词的list
+    '''
+    if lexicon is not None:
+        data = lexicon.remove(data, ' ')
+    import jieba
     # ltp的自定义词典会不生效
     terms = jieba.cut(data)
     if remove_stopwords:
         terms = [term for term in terms if term not in _STOP_WORDS]
 
     filterd_terms = []
+    table = char_table.get_table()
 
     for idx, term in enumerate(terms):
         if remove_rare:
-            is_rare = all([chr in _RARE_WORDS for chr in term])
+            is_rare = all([table[ord(chr)] & char_table.RARE for chr in term])
             if is_rare:
                 continue
         if remove_punc:
-            chrs = [chr for chr in term if not ch_utils.is_punctuation(chr)]
+            chrs = [chr for chr in term if not table[ord(chr)] & char_table.PUNCTUATION]
             new_term = ''.join(chrs)
             new_term = new_term.strip()
         else:
@@ -244,7 +494,80 @@ def preprocess_text_segmentation(data: str,
         if new_term:
             filterd_terms.append(new_term)
 
-    return joint.join(filterd_terms)
+    return filterd_terms
+
+
+def preprocess_segment_document(data, remove_stopwords=True, remove_punc=True, remove_rare=True, lexicon=None,
+                                **kwargs):
+    '''
+    分词，结果以Document表示：只保存原文和词的偏移量，过滤都在偏移量上完成，不复制文本。
+    和 preprocess_text_segmentation 的区别：词内部的标点和空白会把词切分为多个词，
+    lexicon 匹配到的字符在分词后从词中删除，而不是在分词前替换为空格
+    :param data: 单条文本或文本的list
+    :param remove_stopwords: 是否移除停用词
+    :param remove_punc: 是否移除标点符号和空白符
+    :param remove_rare: 是否移除都是生僻字的词
+    :param lexicon: 需要删除的词表（Lexicon）
+    :param kwargs 吸收不相关参数
+    :return: Document，或者Document的list
+    '''
+    if not isinstance(data, str):
+        return [preprocess_segment_document(str(text), remove_stopwords, remove_punc, remove_rare, lexicon)
+                for text in data]
+    document = Document.segment(data)
+    if lexicon is not None:
+        document = document.remove_spans(lexicon.spans(data))
+    if remove_stopwords:
+        document = document.remove_tokens(_STOP_WORDS)
+    if remove_rare:
+        document = document.remove_rare()
+    if remove_punc:
+        document = document.remove_flags(char_table.PUNCTUATION | char_table.WHITESPACE)
+    return document
+
+
+def segment_batch(data,
+                  output=SEGMENT_TOKENS,
+                  joint=' ',
+                  remove_stopwords=True,
+                  remove_punc=True,
+                  remove_rare=True,
+                  lexicon=None,
+                  workers=None,
+                  chunksize=100,
+                  batch_size=1000):
+    '''
+    批量分词，过滤规则和 preprocess_text_segmentation 相同，但可以直接返回词的list，省去拼接后再切分
+    :param data: 文本的list，或者任意可迭代对象
+    :param output: tokens：每篇文本的词list；text：用joint拼接的字符串；
+                   flat：(所有文本的词依次拼接的list, 长度为文本数+1的偏移量数组，第i篇文本的词为 tokens[offsets[i]:offsets[i+1]])；
+                   document：每篇文本的Document，见 preprocess_segment_document
+    :param joint: output为text时的连接字符
+    :param remove_stopwords: 是否移除停用词
+    :param remove_punc: 是否移除标点符号
+    :param remove_rare: 是否移除都是生僻字的词
+    :param lexicon: 分词前过滤的词表，见 preprocess_text_segmentation
+    :param workers: 进程数，大于1时使用进程池并行分词，每个进程只初始化一次jieba
+    :param chunksize: 并行处理时每个任务包含的文档数
+    :param batch_size: 单进程处理时每批次的文档数
+    :return:
+    '''
+    if output not in (SEGMENT_TOKENS, SEGMENT_TEXT, SEGMENT_FLAT, SEGMENT_DOCUMENT):
+        raise ValueError('unsupported output: {}'.format(output))
+    stage = preprocess_segment_document if output == SEGMENT_DOCUMENT else _segment_terms
+    pipeline = PreprocessPipeline([stage], remove_stopwords=remove_stopwords,
+                                  remove_punc=remove_punc, remove_rare=remove_rare, lexicon=lexicon)
+    results = pipeline.process_stream(data, batch_size=batch_size, workers=workers, chunksize=chunksize)
+    if output in (SEGMENT_TOKENS, SEGMENT_DOCUMENT):
+        return list(results)
+    if output == SEGMENT_TEXT:
+        return [joint.join(terms) for terms in results]
+    tokens = []
+    offsets = [0]
+    for terms in results:
+        tokens.extend(terms)
+        offsets.append(len(tokens))
+    return tokens, np.array(offsets, dtype=np.int64)
 
 
 @process_iter
@@ -257,6 +580,53 @@ def preprocess_replace_whitespace(data: str, repl=' ', **kwargs):
     return re.sub(usual_pattern.PATTERN_WHITE_SPACE, repl, data)
 
 
+@process_iter
+def preprocess_clean_text(data: str, repl=' ', **kwargs):
+    """
+    一次扫描完成 preprocess_remove_links，preprocess_remove_html_marks 和 preprocess_replace_whitespace，
+    结果和依次调用相同（文本中有 @ 时先单独删除邮件地址）。repl为空字符串时相当于再执行一次 preprocess_strip_blanks
+    :param data:
+    :param repl: 空白符替换成的字符
+    :param kwargs:
+    :return:
+    """
+    if '@' in data:
+        # 删除邮件地址后前后的文本可能组成新的链接（如 john.doe@gmail.com 只删除 doe@gmail.com），
+        # 无法和删除链接合并，单独执行一次
+        data = usual_pattern.PATTERN_EMAIL.sub('', data)
+    program = _CLEAN_TEXT_PROGRAMS.get(repl)
+    if program is None:
+        # 标签中的内容全部是链接时，删除链接后剩下的 <> 不再是标签，这时只删除链接
+        tag = '<(?!(?:(?=(?P<link>{}))(?P=link))+>)[^>]+>'.format(usual_pattern.PATTERN_URL.pattern)
+        rules = [(usual_pattern.PATTERN_URL, ''), (tag, '')]
+        if repl:
+            # 依次处理时，删除链接和标签后两侧的空白会连成一段再分段替换，
+            # 这类片段以及本身会被分成多段的空白（如 \u2003\t）交给 _clean_segment 处理。
+            # (?=(?P<x>...))(?P=x) 相当于固化分组，和 re.sub 一样不回溯到更短的匹配
+            removed = [usual_pattern.PATTERN_URL, usual_pattern.PATTERN_HTML_MAKR]
+            removed_run = '(?:(?=(?P<removed>{}))(?P=removed))+'.format('|'.join(p.pattern for p in removed))
+            token = '(?=(?P<{}>' + usual_pattern.PATTERN_WHITE_SPACE + '))(?P={})'
+            rules.append(('{}(?:(?:{})?{})+'.format(token.format('head', 'head'), removed_run,
+                                                token.format('tail', 'tail')),
+                          lambda match: _clean_segment(match.group(), repl)))
+        rules.append((usual_pattern.PATTERN_WHITE_SPACE, repl))
+        program = SubstitutionProgram(rules)
+        _CLEAN_TEXT_PROGRAMS[repl] = program
+    return program.sub(data)
+
+
+def _clean_segment(text, repl):
+    """
+    对夹在空白之间、已经删除邮件地址的片段依次执行 preprocess_clean_text 的其余步骤
+    :param text:
+    :param repl:
+    :return:
+    """
+    text = usual_pattern.PATTERN_URL.sub('', text)
+    text = usual_pattern.PATTERN_HTML_MAKR.sub('', text)
+    return re.sub(usual_pattern.PATTERN_WHITE_SPACE, repl, text)
+
+
 @process_iter
 def preprocess_remove_html_marks(data: str, **kwargs):
     """
@@ -280,22 +650,86 @@ def preprocess_replace_html_marks(data: str, object="，", **kwargs):
 
 
 @process_iter
-def preprocess_remove_duplacte_words(data, **kwargs):
+def preprocess_remove_duplacte_words(data, max_unit_len=None, **kwargs):
     """
-    去除很多重复的词和标点符号
+    去除很多重复的词和标点符号，连续重复3次以上的单元只保留一个，最多处理6轮
     preprocess_remove_duplacte_words('東亞亞亞、、、it----.... is')
 
     東亞、it-. is
+    :param data:
+    :param max_unit_len: 重复单元的最大长度，None表示短文本不限制，不短于 _DUPLICATE_SCAN_MIN_LEN 的文本使用
+                         DUPLICATE_UNIT_MAX_LEN。不限制长度时长文本上会产生大量回溯，处理时间和文本长度的平方成正比
+    :param kwargs:
+    :return:
     """
-    reg = r'([^0-9I]+)(\1){2,}'
+    if max_unit_len is None and len(data) >= _DUPLICATE_SCAN_MIN_LEN:
+        max_unit_len = DUPLICATE_UNIT_MAX_LEN
+    pattern = _duplicate_pattern(max_unit_len)
     for i in range(6):
         temp = data
-        data = re.sub(reg, lambda m: m.group(1), data)
+        data = _collapse_repeats(data, pattern, max_unit_len)
         if len(data) == len(temp):
             break
     return data
 
 
+@lru_cache(maxsize=None)
+def _duplicate_pattern(max_unit_len):
+    if max_unit_len is None:
+        quantifier = '+'
+    elif max_unit_len < 1:
+        raise ValueError('max_unit_len must be positive: {}'.format(max_unit_len))
+    else:
+        quantifier = '{{1,{}}}'.format(max_unit_len)
+    return re.compile(r'([^0-9I]' + quantifier + r')\1{2,}')
+
+
+def _collapse_repeats(data, pattern, max_unit_len):
+    """
+    一轮替换，结果和 pattern.sub(r"\\1", data) 相同。
+    长文本先找出可能出现重复的位置，只在这些位置尝试匹配，避免正则在每个位置上逐个尝试所有单元长度
+    :param data:
+    :param pattern:
+    :param max_unit_len:
+    :return:
+    """
+    if max_unit_len is None or len(data) < _DUPLICATE_SCAN_MIN_LEN:
+        return pattern.sub(r'\1', data)
+    pieces = []
+    pos = 0
+    for start in _repeat_candidates(data, max_unit_len).tolist():
+        if start < pos:
+            continue
+        match = pattern.match(data, start)
+        if match is None:
+            continue
+        pieces.append(data[pos:start])
+        pieces.append(match.group(1))
+        pos = match.end()
+    if not pieces:
+        return data
+    pieces.append(data[pos:])
+    return ''.join(pieces)
+
+
+def _repeat_candidates(data, max_unit_len):
+    """
+    位置i处某个长度为L的单元连续出现3次，当且仅当 data[i:i+2L] 和 data[i+L:i+3L] 完全相同
+    :param data:
+    :param max_unit_len:
+    :return: 可能以重复单元开始的位置，升序排列
+    """
+    codes = np.frombuffer(data.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    found = np.zeros(len(codes), dtype=bool)
+    for length in range(1, min(max_unit_len, len(codes) // 3) + 1):
+        same = codes[:-length] == codes[length:]
+        positions = np.arange(len(same))
+        # 每个位置之后第一个不相同的位置
+        next_diff = np.minimum.accumulate(np.where(same, len(same), positions)[::-1])[::-1]
+        found[:len(same)] |= next_diff - positions >= 2 * length
+    return np.flatnonzero(found)
+
+
 def preprocess_remove_symbols(data: str, **kwargs):
     """
     移除不知名的特殊符号
@@ -303,59 +737,34 @@ def preprocess_remove_symbols(data: str, **kwargs):
     :param kwargs:
     :return:
     """
-    data_res = []
-    for chr in data:
-        cate = unicodedata.category(chr)
-        # Symbol, Other; Symbol, Currency
-        if cate == 'So' or cate == 'Sc':
-            continue
-        data_res.append(chr)
-
-    return ''.join(data_res)
+    # Symbol, Other; Symbol, Currency
+    return data.translate(ch_utils.flag_table(char_table.SYMBOL))
 
 
 @process_iter
 def preprocess_filter_other_language(data: str, **kwargs):
     """
-    过滤掉非中文文本，当文本为非中文时，直接返回空字符串
+    过滤掉非中文文本，当文本为非中文时，直接返回空字符串。
+    先根据文字分布判断，只有不确定的文本才使用langdetect，批量处理时直接使用 LanguageIdentifier.is_language_batch
     :param data:
     :param kwargs:
     :return:
     """
-    try:
-        lag = langdetect.detect(data)
-    except Exception as e:
-        return ""
-    if lag == 'zh-cn':
+    if _language_identifier.is_language(data, 'zh-cn'):
         return data
-    else:
-        return ""
+    return ""
 
 
 @process_iter
 def preprocess_weibo_content(data: str, sentence_joint_chr='，', **kwargs):
     """
-    处理微博内容
+    处理微博内容，需要话题，@的用户，链接等字段时使用 WeiboParser.parse
     :param line:
     :return:
     """
-    topics = re.findall(usual_pattern.WEIBO_PATTERN_TOPIC, data)
-    topic = sentence_joint_chr.join(topics)
-    if len(topic) < 15:
-        data = re.sub(usual_pattern.PATTERN_URL, sentence_joint_chr, data)
-        if data.endswith("...全文"):
-            data = data[:len(data) - 6]
-        items = []
-        if topic:
-            items.append(topic)
-        for item in data.split("//"):
-            # 去除@的人物
-            item = re.sub(r'@.{1,15}[:：\ ]', '', item)
-            if not item:
-                continue
-            items.append(item)
-        result = sentence_joint_chr.join(items)
-    else:
-        result = topic
+    return _weibo_parser(sentence_joint_chr).clean(data)
+
 
-    return result
+@lru_cache(maxsize=None)
+def _weibo_parser(sentence_joint_chr):
+    return WeiboParser(sentence_joint_chr)
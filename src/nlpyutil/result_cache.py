@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import types
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'disk_hits', 'misses', 'maxsize', 'currsize'])
+
+from . import __version__
+
+# 这些类型的结果直接保存在内存缓存中，其它结果保存序列化后的副本
+_IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+_NAMED_TYPES = (type, types.BuiltinFunctionType)
+
+
+def pipeline_fingerprint(func_list, kwargs):
+    '''
+    pipeline的指纹，由nlpyutil的版本、处理函数列表和参数决定，函数或者参数变化后缓存自动失效。
+    指纹在多次运行之间保持不变：python函数使用字节码、常量、默认参数和闭包变量，类和内置函数使用模块名和限定名，
+    对象需要提供 fingerprint() 方法。函数中引用的全局变量不在指纹中，它们变化时需要更换缓存
+    :param func_list:
+    :param kwargs:
+    :return:
+    :raise ValueError: 处理函数或者参数没有稳定的表示
+    '''
+    funcs = [_stable_repr(func) for func in func_list]
+    params = sorted((key, _stable_repr(value)) for key, value in kwargs.items())
+    return hashlib.blake2b(repr((__version__, funcs, params)).encode('utf-8'), digest_size=16).digest()
+
+
+def _stable_repr(value, expanding=()):
+    '''
+    :param value:
+    :param expanding: 正在展开的函数的id，闭包引用自身时不再展开
+    :return: 和对象地址、哈希随机化无关的字符串表示
+    '''
+    if isinstance(value, _IMMUTABLE_TYPES + (complex, type(Ellipsis))):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return '{}[{}]'.format(type(value).__name__, ', '.join(_stable_repr(item, expanding) for item in value))
+    if isinstance(value, (set, frozenset)):
+        items = sorted(_stable_repr(item, expanding) for item in value)
+        return '{}{{{}}}'.format(type(value).__name__, ', '.join(items))
+    if isinstance(value, dict):
+        items = sorted('{}: {}'.format(_stable_repr(key, expanding), _stable_repr(item, expanding))
+                       for key, item in value.items())
+        return '{{{}}}'.format(', '.join(items))
+    if isinstance(value, _NAMED_TYPES):
+        return '{}.{}'.format(value.__module__, value.__qualname__)
+    if isinstance(value, types.FunctionType):
+        name = '{}.{}'.format(value.__module__, value.__qualname__)
+        if id(value) in expanding:
+            return name
+        expanding += (id(value),)
+        cells = [cell.cell_contents for cell in value.__closure__ or ()]
+        return '{}({}, {}, {}, {})'.format(name, _code_repr(value.__code__, expanding),
+                                           _stable_repr(value.__defaults__, expanding),
+                                           _stable_repr(value.__kwdefaults__, expanding),
+                                           _stable_repr(cells, expanding))
+    if isinstance(value, types.CodeType):
+        return _code_repr(value, expanding)
+    if isinstance(value, functools.partial):
+        return 'partial({}, {}, {})'.format(_stable_repr(value.func, expanding), _stable_repr(value.args, expanding),
+                                            _stable_repr(value.keywords, expanding))
+    if isinstance(value, types.MethodType):
+        return '{}.{}'.format(_stable_repr(value.__self__, expanding), _stable_repr(value.__func__, expanding))
+    if callable(getattr(value, 'fingerprint', None)):
+        return '{}({})'.format(_stable_repr(type(value)), value.fingerprint())
+    raise ValueError('{!r} has no stable representation for the result cache, '
+                     'define a fingerprint() method for it'.format(value))
+
+
+def _code_repr(code, expanding):
+    '''
+    :param code: 函数的字节码对象
+    :param expanding:
+    :return: 字节码、常量（包括嵌套函数的字节码）和引用的名字
+    '''
+    digest = hashlib.blake2b(code.co_code, digest_size=16).hexdigest()
+    return 'code({}, {}, {})'.format(digest, _stable_repr(code.co_consts, expanding), _stable_repr(code.co_names))
+
+
+class _Copied(object):
+    '''
+    内存缓存中可变的结果，每次命中时反序列化出新的副本，调用方修改返回值不会影响缓存
+    '''
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
+class ResultCache(object):
+    '''
+    pipeline处理结果的缓存，以输入文本的哈希和pipeline的指纹作为key：
+      1. 内存中的LRU缓存，最多保存maxsize条
+      2. 可选的sqlite磁盘缓存，多次运行，多个进程之间共享
+    '''
+
+    def __init__(self, maxsize=100000, disk_path=None, write_batch=256):
+        '''
+        :param maxsize: 内存缓存的最大条数
+        :param disk_path: sqlite文件路径，None表示不使用磁盘缓存
+        :param write_batch: 磁盘缓存每积累多少条写入提交一次
+        '''
+        self._maxsize = maxsize
+        self._disk_path = disk_path
+        self._write_batch = write_batch
+        self._init_state()
+
+    def _init_state(self):
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._connection = None
+        self._connection_pid = None
+        self._pending_writes = []
+
+    def __getstate__(self):
+        # 传递给子进程时只保留配置，缓存内容和数据库连接由子进程自己建立
+        return {'_maxsize': self._maxsize, '_disk_path': self._disk_path, '_write_batch': self._write_batch}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+    @staticmethod
+    def make_key(fingerprint, text):
+        '''
+        :param fingerprint: pipeline_fingerprint 的结果
+        :param text: 输入文本
+        :return:
+        '''
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16, key=fingerprint).digest()
+
+    def get(self, key):
+        '''
+        :param key:
+        :return: (是否命中, 缓存的值)
+        '''
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                value = self._memory[key]
+                return True, pickle.loads(value.data) if isinstance(value, _Copied) else value
+            if self._disk_path:
+                row = self._get_connection().execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    value = pickle.loads(row[0])
+                    self._set_memory(key, value if isinstance(value, _IMMUTABLE_TYPES) else _Copied(row[0]))
+                    self._disk_hits += 1
+                    return True, value
+            self._misses += 1
+            return False, None
+
+    def set(self, key, value):
+        '''
+        :param key:
+        :param value: 保存的是value的副本，之后修改value不会影响缓存
+        :return:
+        '''
+        data = None
+        if not isinstance(value, _IMMUTABLE_TYPES):
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            value = _Copied(data)
+        with self._lock:
+            self._set_memory(key, value)
+            if self._disk_path:
+                if data is None:
+                    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                self._pending_writes.append((key, data))
+                if len(self._pending_writes) >= self._write_batch:
+                    self._flush_writes()
+
+    def flush(self):
+        '''
+        将未提交的结果写入磁盘缓存
+        :return:
+        '''
+        with self._lock:
+            self._flush_writes()
+
+    def clear(self):
+        '''
+        清空内存缓存和统计信息，磁盘缓存保持不变
+        :return:
+        '''
+        with self._lock:
+            self._memory.clear()
+            self._hits = self._disk_hits = self._misses = 0
+
+    def info(self):
+        return CacheInfo(self._hits, self._disk_hits, self._misses, self._maxsize, len(self._memory))
+
+    def close(self):
+        with self._lock:
+            self._flush_writes()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _set_memory(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._maxsize:
+            self._memory.popitem(last=False)
+
+    def _flush_writes(self):
+        if not self._pending_writes:
+            return
+        connection = self._get_connection()
+        with connection:
+            connection.executemany('INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)', self._pending_writes)
+        self._pending_writes = []
+
+    def _get_connection(self):
+        '''
+        数据库连接不能跨进程使用，fork后需要重新建立
+        :return:
+        '''
+        pid = os.getpid()
+        if self._connection is None or self._connection_pid != pid:
+            connection = sqlite3.connect(self._disk_path, timeout=60, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, value BLOB)')
+            connection.commit()
+            self._connection = connection
+            self._connection_pid = pid
+        return self._connection
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+
+_FLAG_LETTERS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+_BACKREFERENCE = re.compile(r'\\[1-9]')
+
+
+class SubstitutionProgram(object):
+    '''
+    将多个正则替换合并为一次扫描：所有规则的正则合并为一个多选分支的正则，
+    每次匹配根据命中的分支选择对应的替换。规则中不能使用数字编号的反向引用，命名引用不受影响。
+    在同一位置有多个规则可以匹配时，靠前的规则优先。当不同规则的匹配之间没有重叠，
+    并且删除一个匹配后不会和相邻的文本组成另一个规则的匹配时，结果和依次调用 re.sub 相同
+    '''
+
+    def __init__(self, rules):
+        '''
+        :param rules: (pattern, replacement) 的list，pattern 为字符串或编译后的正则，
+                      replacement 为替换的字符串（不处理反斜杠转义），或者接收match对象返回字符串的函数
+        '''
+        if not rules:
+            raise ValueError('rules can not be empty')
+        branches = []
+        self._replacements = {}
+        for index, (pattern, replacement) in enumerate(rules):
+            name = '_r{}'.format(index)
+            branches.append('(?P<{}>{})'.format(name, _inline_flags(pattern)))
+            self._replacements[name] = replacement
+        self._pattern = re.compile('|'.join(branches))
+        replacements = list(self._replacements.values())
+        # 所有规则替换为同一个字符串时，不需要逐个匹配回调python函数
+        if all(isinstance(replacement, str) for replacement in replacements) and len(set(replacements)) == 1:
+            self._repl = replacements[0].replace('\\', '\\\\')
+        else:
+            self._repl = self._replace
+
+    @property
+    def pattern(self):
+        return self._pattern
+
+    def fingerprint(self):
+        '''
+        :return: 合并后的正则和每个规则的替换，替换函数使用模块名和限定名
+        '''
+        replacements = [replacement if isinstance(replacement, str) else
+                        '{}.{}'.format(getattr(replacement, '__module__', ''),
+                                       getattr(replacement, '__qualname__', type(replacement).__qualname__))
+                        for replacement in self._replacements.values()]
+        return repr((self._pattern.pattern, self._pattern.flags, replacements))
+
+    def sub(self, text):
+        return self._pattern.sub(self._repl, text)
+
+    def _replace(self, match):
+        replacement = self._replacements[match.lastgroup]
+        if isinstance(replacement, str):
+            return replacement
+        return replacement(match)
+
+    def __call__(self, data, **kwargs):
+        '''
+        作为PreprocessPipeline中的处理函数使用
+        :param data: 单条文本或文本的list
+        :param kwargs: 吸收不相关参数
+        :return:
+        '''
+        if not data:
+            return data
+        if isinstance(data, str):
+            return self.sub(data)
+        return [self.sub(str(text)) for text in data]
+
+
+def _inline_flags(pattern):
+    '''
+    将编译后正则的flag转换为只作用于该分支的内联flag
+    :param pattern:
+    :return:
+    '''
+    if isinstance(pattern, str):
+        source, flags = pattern, 0
+    else:
+        source, flags = pattern.pattern, pattern.flags
+    if _BACKREFERENCE.search(source):
+        raise ValueError('backreferences are not supported in substitution rules: {}'.format(source))
+    letters = ''.join(letter for flag, letter in _FLAG_LETTERS if flags & flag)
+    if letters:
+        return '(?{}:{})'.format(letters, source)
+    return source
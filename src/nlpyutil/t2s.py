@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+繁体转简体。大部分输入本身就是简体，opencc 逐段做短语匹配的开销没有必要：
+  1. 不包含任何会被转换的字符的文本原样返回
+  2. 不包含"不规则短语"（短语的转换结果和逐字转换的结果不同）的文本，用 str.translate 逐字转换
+  3. 其余文本才使用 opencc 做短语级的转换
+三种方式的结果和 OpenCC('t2s').convert 完全一致
+"""
+
+import bisect
+import os
+import re
+from functools import lru_cache
+
+import opencc
+
+_DICTIONARY_DIR = os.path.join(os.path.dirname(os.path.abspath(opencc.__file__)), 'dictionary')
+
+
+def load_dictionary(name):
+    '''
+    读取opencc的字典文件，每行为 key\t候选1 候选2 ...
+    :param name: 字典名，如 TSCharacters
+    :return: key到候选list的dict
+    '''
+    dictionary = {}
+    with open(os.path.join(_DICTIONARY_DIR, name + '.txt'), 'r', encoding='utf-8') as file:
+        for line in file:
+            key, _, values = line.rstrip('\r\n').partition('\t')
+            if key and values:
+                dictionary[key] = values.split(' ')
+    return dictionary
+
+
+@lru_cache(maxsize=None)
+def traditional_chars():
+    '''
+    繁体字：t2s转换时会被替换为其它字符的单个字符
+    :return:
+    '''
+    return frozenset(key for key, values in load_dictionary('TSCharacters').items() if values[0] != key)
+
+
+def _cover_chars(words, preferred):
+    '''
+    贪心地选择尽量少的字符，使每个词都至少包含其中一个字符。
+    只要文本中出现了某个词，就一定出现了选出的字符
+    :param words:
+    :param preferred: 覆盖的词数相同时优先选择的字符，如繁体字典中的字，避免选中常用的简体字
+    :return:
+    '''
+    chars = set()
+    remaining = [set(word) for word in words]
+    while remaining:
+        counts = {}
+        for word in remaining:
+            for char in word:
+                counts[char] = counts.get(char, 0) + 1
+        best = max(sorted(counts), key=lambda char: (counts[char], char in preferred))
+        chars.add(best)
+        remaining = [word for word in remaining if best not in word]
+    return chars
+
+
+class T2SConverter(object):
+    '''
+    繁体转简体的转换器，字典在首次转换时加载
+    '''
+
+    def __init__(self):
+        self._opencc = None
+        self._table = None
+
+    def __getstate__(self):
+        # 传递给子进程时只保留空的转换器，字典由子进程自己加载
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def load(self):
+        '''
+        加载字典，构建逐字转换表和不规则短语的正则，已经加载时直接返回
+        :return:
+        '''
+        if self._table is not None:
+            return
+        characters = load_dictionary('TSCharacters')
+        phrases = load_dictionary('TSPhrases')
+        # opencc 对有多个候选的字和短语都使用第一个候选
+        table = {ord(key): values[0] for key, values in characters.items() if values[0] != key}
+        irregular = sorted((key for key, values in phrases.items() if values[0] != key.translate(table)),
+                           key=lambda key: (-len(key), key))
+        # 不包含会被逐字转换的字符的不规则短语本身也会改变文本，它们的字也需要触发转换
+        triggers = set(map(chr, table))
+        triggers.update(_cover_chars([key for key in irregular if key == key.translate(table)], characters))
+        self._triggers = frozenset(triggers)
+        self._irregular = re.compile('|'.join(map(re.escape, irregular))) if irregular else None
+        self._opencc = opencc.OpenCC('t2s')
+        self._table = table
+
+    def needs_conversion(self, text):
+        '''
+        :param text:
+        :return: 文本转换后是否会发生变化
+        '''
+        if self._table is None:
+            self.load()
+        return not self._triggers.isdisjoint(text)
+
+    def convert(self, text):
+        if self._table is None:
+            self.load()
+        if self._triggers.isdisjoint(text):
+            return text
+        if self._irregular is None or not self._irregular.search(text):
+            return text.translate(self._table)
+        return self._opencc.convert(text)
+
+    def convert_batch(self, texts):
+        '''
+        批量转换：所有文本拼接后只做一次检测和逐字转换，只有包含不规则短语的文本单独使用opencc转换
+        :param texts: 文本的list
+        :return:
+        '''
+        if self._table is None:
+            self.load()
+        texts = [text if isinstance(text, str) else str(text) for text in texts]
+        # 换行符是opencc的分隔符，短语不会跨越两篇文本
+        joined = '\n'.join(texts)
+        if self._triggers.isdisjoint(joined):
+            return texts
+        # 逐字转换不改变文本长度，可以按原来的偏移量切分
+        converted = joined.translate(self._table)
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        results = [converted[start:start + len(text)] for start, text in zip(starts, texts)]
+        if self._irregular is not None:
+            for match in self._irregular.finditer(joined):
+                index = bisect.bisect_right(starts, match.start()) - 1
+                results[index] = self._opencc.convert(texts[index])
+        return results
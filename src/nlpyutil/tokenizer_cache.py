@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+jieba分词器的持久化缓存：构建好的前缀词典（包括加载的用户词典）序列化到磁盘，
+文件名由jieba版本和所有词典文件内容的哈希决定，词典变化后自动重新构建
+"""
+
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import weakref
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'nlpyutil')
+
+# 每个分词器当前加载的缓存key，避免重复加载
+_loaded_keys = weakref.WeakKeyDictionary()
+
+# 词典文件状态(路径, 修改时间, 大小) -> 哈希，文件不变时不重复读取主词典
+_fingerprints = {}
+
+# 构建时会临时替换finalseg的全局集合
+_build_lock = threading.Lock()
+
+
+def dictionary_fingerprint(tokenizer, user_dicts=()):
+    '''
+    :param tokenizer: jieba.Tokenizer
+    :param user_dicts: 用户词典文件路径的list
+    :return: 主词典和用户词典内容的哈希
+    '''
+    import jieba
+    paths = list(user_dicts)
+    if tokenizer.dictionary is not None:
+        paths.append(os.path.abspath(tokenizer.dictionary))
+    try:
+        stats = tuple((path, os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths)
+    except OSError:
+        stats = None
+    memo_key = (tokenizer.dictionary is None, stats)
+    if stats is not None and memo_key in _fingerprints:
+        return _fingerprints[memo_key]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(jieba.__version__.encode('utf-8'))
+    with tokenizer.get_dict_file() as file:
+        digest.update(file.read())
+    for path in user_dicts:
+        with open(path, 'rb') as file:
+            content = file.read()
+        digest.update(len(content).to_bytes(8, 'little'))
+        digest.update(content)
+    fingerprint = digest.hexdigest()
+    if stats is not None:
+        _fingerprints[memo_key] = fingerprint
+    return fingerprint
+
+
+def load_tokenizer(tokenizer=None, user_dicts=(), cache_dir=None):
+    '''
+    初始化分词器：缓存存在时直接从磁盘加载，否则构建前缀词典、加载用户词典后写入缓存
+    :param tokenizer: jieba.Tokenizer，默认为jieba的全局分词器
+    :param user_dicts: 用户词典文件路径的list，格式同 jieba.load_userdict
+    :param cache_dir: 缓存目录，默认为 ~/.cache/nlpyutil
+    :return: 初始化后的分词器
+    '''
+    import jieba
+    from jieba import finalseg
+    if tokenizer is None:
+        tokenizer = jieba.dt
+    user_dicts = [os.path.abspath(path) for path in user_dicts]
+    key = dictionary_fingerprint(tokenizer, user_dicts)
+    if _loaded_keys.get(tokenizer) == key:
+        return tokenizer
+    path = os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'jieba.{}.pkl'.format(key))
+
+    state = _read_cache(path)
+    if state is None:
+        state = _build_state(tokenizer.dictionary, user_dicts)
+        _write_cache(path, state)
+    with tokenizer.lock:
+        tokenizer.FREQ, tokenizer.total, tokenizer.user_word_tag_tab = state['freq'], state['total'], state['tags']
+        tokenizer.initialized = True
+    finalseg.Force_Split_Words.update(state['force_split'])
+    _loaded_keys[tokenizer] = key
+    return tokenizer
+
+
+def _build_state(dictionary, user_dicts):
+    '''
+    用新的分词器构建前缀词典，不会带上目标分词器之前加载过的用户词
+    :param dictionary: 主词典路径，None为jieba自带词典
+    :param user_dicts:
+    :return:
+    '''
+    import jieba
+    from jieba import finalseg
+    fresh = jieba.Tokenizer(dictionary or jieba.DEFAULT_DICT)
+    with _build_lock:
+        # 词频为0的用户词会记录在finalseg的全局集合中，不在FREQ里，构建期间换成空集合单独收集
+        global_words = finalseg.Force_Split_Words
+        finalseg.Force_Split_Words = set()
+        try:
+            fresh.initialize()
+            for user_dict in user_dicts:
+                fresh.load_userdict(user_dict)
+            force_split = finalseg.Force_Split_Words
+        finally:
+            finalseg.Force_Split_Words = global_words
+    return {
+        'freq': fresh.FREQ,
+        'total': fresh.total,
+        'tags': fresh.user_word_tag_tab,
+        'force_split': force_split
+    }
+
+
+def _read_cache(path):
+    if not os.path.isfile(path):
+        return None
+    # 反序列化几十万个小对象时，垃圾回收会被反复触发
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    except Exception:
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _write_cache(path, state):
+    '''
+    先写入临时文件再替换，多个进程同时写入时不会读到不完整的缓存。写入失败时忽略
+    :param path:
+    :param state:
+    :return:
+    '''
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except BaseException as error:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        if not isinstance(error, OSError):
+            raise
@@ -22,6 +22,8 @@
 # SOFTWARE.
 
 import re
+from collections import namedtuple
+from functools import lru_cache
 from zhon import hanzi
 import string
 
@@ -36,11 +38,14 @@ PATTERN_SPACES = re.compile(r'( |\t)+')
 # 中文字符，包括汉字和中文标点符号两部分
 PATTERN_CHINESE_CHARS = re.compile(
     r'[\u4e00-\u9fa5]+' + '|[' + ''.join(DATA_CHINESE_PUNCTUATION + [',', '!']) + ']+')
-# 邮件地址
-PATTERN_EMAIL = re.compile(r'[a-zA-Z0-9_-]+@[a-zA-Z0-9_-]+(?:\.[a-zA-Z0-9_-]+)+')
-# 完整URL
+# 邮件地址。只从连续的用户名字符的开头尝试匹配：从开头匹配失败时，从中间开始也一定失败，
+# 这样每段字符只被扫描常数次，匹配时间和文本长度成线性关系
+PATTERN_EMAIL = re.compile(r'(?=[a-zA-Z0-9_-])(?<![a-zA-Z0-9_-])[a-zA-Z0-9_-]+@[a-zA-Z0-9_-]+(?:\.[a-zA-Z0-9_-]+)+')
+# 完整URL，协议部分最多3层，不包含空格。和邮件地址一样，不从字母的中间开始匹配；
+# 跟在_或-之后的字母只有以协议开始时才尝试匹配，其它情况从这一段的开头已经尝试过
 PATTERN_URL = re.compile(
-    r'(?:[a-zA-Z]+://)*(?:[a-zA-Z_-]+(?:\.[0-9a-zA-Z]+)[a-zA-Z0-9 %_@/$.&+?=-]*)')
+    r'(?=[a-zA-Z_-])(?<![a-zA-Z])(?:(?<![_-])|(?=[a-zA-Z]+://))'
+    r'(?:[a-zA-Z]+://){0,3}[a-zA-Z_-]+\.[0-9a-zA-Z][a-zA-Z0-9%_@/$.&+?=-]*')
 # 数字提取
 PATTERN_NUMBER = r'[1-9]+\.?[0-9]*'
 # 身份证
@@ -61,6 +66,27 @@ WEIBO_PATTERN_TOPIC = re.compile(r'#([^#]+)#')
 CHUANTONG_BOOK_MARK = re.compile(r'【.{0,20}】')
 CHUANTONG_SENTENCE_SPLITTER = re.compile(r'[\u3000]+')
 
+# extract_entities 支持的实体类型
+ENTITY_EMAIL = 'email'
+ENTITY_URL = 'url'
+ENTITY_ID_CARD = 'id_card'
+ENTITY_MOBILE = 'mobile'
+ENTITY_PHONE = 'phone'
+# extract_entities 使用的正则，同一位置可以匹配多种实体时，靠前的优先。
+# 邮件地址的用户名允许 . 和 +（如 john.doe@gmail.com），否则会被链接的分支整个匹配为链接；
+# 只在用户名开头尝试匹配，用户名中以 . 分隔的各段互不重叠，匹配时间是线性的。
+# 数字类实体用前后不是数字的断言代替 PATTERN_MOBILE 等消耗前后字符的写法，相邻的号码不会漏掉
+ENTITY_PATTERNS = [
+    (ENTITY_EMAIL, r'(?=[a-zA-Z0-9_+-])(?<![a-zA-Z0-9_.+-])[a-zA-Z0-9_+-]+(?:\.[a-zA-Z0-9_+-]+)*'
+                   r'@[a-zA-Z0-9_-]+(?:\.[a-zA-Z0-9_-]+)+'),
+    (ENTITY_URL, PATTERN_URL.pattern),
+    (ENTITY_ID_CARD, r'(?<!\d)[1-9]\d{16}[0-9Xx](?![0-9a-zA-Z])'),
+    (ENTITY_MOBILE, r'(?<![\d+])(?:\+\d+)?1[3458]\d{9}(?!\d)'),
+    (ENTITY_PHONE, r'(?<![\d-])(?:\d{3,4}-?)?\d{7,8}(?!\d)'),
+]
+
+Entity = namedtuple('Entity', ['kind', 'start', 'end', 'value'])
+
 
 def extract_emails(text: str):
     """
@@ -111,6 +137,77 @@ def extract_phones(text: str):
     return "|".join(result)
 
 
+@lru_cache(maxsize=None)
+def _entity_pattern(kinds):
+    '''
+    所有实体的正则合并为一个多选分支的正则，分支名即实体类型。
+    :param kinds: 实体类型的tuple，None表示全部
+    :return:
+    '''
+    branches = ['(?P<{}>{})'.format(kind, pattern) for kind, pattern in ENTITY_PATTERNS
+                if kinds is None or kind in kinds]
+    if not branches:
+        raise ValueError('unsupported entity kinds: {}'.format(kinds))
+    # 所有实体都以这些字符开始，前瞻让正则在其它位置上不必逐个尝试分支
+    return re.compile('(?=[a-zA-Z0-9_+-])(?:{})'.format('|'.join(branches)))
+
+
+def extract_entities(text: str, kinds=None):
+    '''
+    一次扫描抽取文本中的邮箱，链接，身份证号，手机号和电话号码，实体之间不重叠
+    :param text:
+    :param kinds: 需要抽取的实体类型的list，默认为 ENTITY_PATTERNS 中的全部类型
+    :return: Entity(kind, start, end, value) 的list，按出现的位置排列
+    '''
+    pattern = _entity_pattern(None if kinds is None else tuple(kinds))
+    return [Entity(match.lastgroup, match.start(), match.end(), match.group()) for match in pattern.finditer(text)]
+
+
+def extract_entities_batch(texts, kinds=None):
+    '''
+    :param texts: 文本的list
+    :param kinds:
+    :return: 每篇文本的 Entity list
+    '''
+    pattern = _entity_pattern(None if kinds is None else tuple(kinds))
+    return [[Entity(match.lastgroup, match.start(), match.end(), match.group()) for match in pattern.finditer(text)]
+            for text in texts]
+
+
+def mask_entities(text: str, placeholders=None, kinds=None):
+    '''
+    一次扫描把实体替换为占位符
+    :param text:
+    :param placeholders: 实体类型到占位符的dict，没有指定的类型替换为 <EMAIL>，<URL> 这样的大写类型名
+    :param kinds: 需要替换的实体类型的list，默认为全部类型
+    :return:
+    '''
+    return _entity_masker(placeholders, kinds)(text)
+
+
+def mask_entities_batch(texts, placeholders=None, kinds=None):
+    '''
+    :param texts: 文本的list
+    :param placeholders:
+    :param kinds:
+    :return: 替换后的文本的list
+    '''
+    mask = _entity_masker(placeholders, kinds)
+    return [mask(text) for text in texts]
+
+
+def _entity_masker(placeholders, kinds):
+    pattern = _entity_pattern(None if kinds is None else tuple(kinds))
+    replacements = {kind: '<{}>'.format(kind.upper()) for kind, _ in ENTITY_PATTERNS}
+    if placeholders:
+        replacements.update(placeholders)
+
+    def mask(text):
+        return pattern.sub(lambda match: replacements[match.lastgroup], text)
+
+    return mask
+
+
 def remove_unusual_ch_marks(text: str, replace_with=' '):
     '''
     去除中文中不常用标点
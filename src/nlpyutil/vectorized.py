@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+基于numpy的批量字符过滤和统计：一批文本拼接后编码为UTF-32的码位数组，
+通过字符类别表（见char_table）得到每个字符的类别掩码，过滤和统计都在numpy中完成，不需要逐字符的python循环
+"""
+
+import numpy as np
+
+from . import char_table
+
+OUTPUT_TEXT = 'text'
+OUTPUT_MASK = 'mask'
+
+
+def encode_batch(texts):
+    '''
+    将一批文本编码为码位数组
+    :param texts: 文本的list
+    :return: (所有文本拼接后的uint32码位数组, 长度为 len(texts)+1 的偏移量数组，第i篇文本为 codes[offsets[i]:offsets[i+1]])
+    '''
+    texts = [text if isinstance(text, str) else str(text) for text in texts]
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum([len(text) for text in texts], out=offsets[1:])
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    return codes, offsets
+
+
+def decode_batch(codes, offsets):
+    '''
+    encode_batch 的逆操作
+    :param codes:
+    :param offsets:
+    :return: 文本的list
+    '''
+    joined = np.ascontiguousarray(codes, dtype=np.uint32).tobytes().decode('utf-32-le', 'surrogatepass')
+    return [joined[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def class_mask(codes, flags):
+    '''
+    :param codes: 码位数组
+    :param flags: char_table 中一个或多个flag的按位或
+    :return: 每个字符是否属于其中任意类别的bool数组
+    '''
+    return (char_table.as_array()[codes] & flags).astype(bool)
+
+
+def filter_batch(texts, flags, keep=True, output=OUTPUT_TEXT):
+    '''
+    批量保留或删除指定类别的字符
+    :param texts: 文本的list
+    :param flags: char_table 中一个或多个flag的按位或
+    :param keep: True表示只保留属于这些类别的字符，False表示删除这些字符
+    :param output: text：返回处理后的文本list；mask：返回 (保留字符的bool掩码, 原文本的偏移量)，
+                   掩码和偏移量都对应 encode_batch 得到的拼接码位数组
+    :return:
+    '''
+    if output not in (OUTPUT_TEXT, OUTPUT_MASK):
+        raise ValueError('unsupported output: {}'.format(output))
+    codes, offsets = encode_batch(texts)
+    mask = class_mask(codes, flags)
+    if not keep:
+        mask = ~mask
+    if output == OUTPUT_MASK:
+        return mask, offsets
+    return decode_batch(codes[mask], _kept_offsets(mask, offsets))
+
+
+def remove_not_chinese(texts, output=OUTPUT_TEXT):
+    '''
+    批量版的 preprocess_remove_not_chinese
+    :param texts:
+    :param output: 见 filter_batch
+    :return:
+    '''
+    return filter_batch(texts, char_table.CHINESE, keep=True, output=output)
+
+
+def remove_en_chars(texts, output=OUTPUT_TEXT):
+    '''
+    批量版的 preprocess_remove_en_chars
+    :param texts:
+    :param output: 见 filter_batch
+    :return:
+    '''
+    return filter_batch(texts, char_table.PRINTABLE, keep=False, output=output)
+
+
+def remove_symbols(texts, output=OUTPUT_TEXT):
+    '''
+    批量版的 preprocess_remove_symbols
+    :param texts:
+    :param output: 见 filter_batch
+    :return:
+    '''
+    return filter_batch(texts, char_table.SYMBOL, keep=False, output=output)
+
+
+def class_ratio(texts, flags):
+    '''
+    每篇文本中属于指定类别的字符所占的比例
+    :param texts: 文本的list
+    :param flags: char_table 中一个或多个flag的按位或
+    :return: float数组，空文本的比例为0
+    '''
+    codes, offsets = encode_batch(texts)
+    counts = np.diff(_kept_offsets(class_mask(codes, flags), offsets))
+    lengths = np.diff(offsets)
+    return np.divide(counts, lengths, out=np.zeros(len(lengths)), where=lengths > 0)
+
+
+def cjk_ratio(texts):
+    return class_ratio(texts, char_table.CJK)
+
+
+def symbol_ratio(texts):
+    return class_ratio(texts, char_table.SYMBOL)
+
+
+def _kept_offsets(mask, offsets):
+    '''
+    过滤后每篇文本的偏移量
+    :param mask:
+    :param offsets:
+    :return:
+    '''
+    kept = np.zeros(len(mask) + 1, dtype=np.int64)
+    np.cumsum(mask, out=kept[1:])
+    return kept[offsets]
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+微博文本解析：话题，@的用户，链接，转发链和清洗后的正文
+"""
+
+import re
+from collections import namedtuple
+
+from . import usual_pattern
+
+WeiboPost = namedtuple('WeiboPost', ['topics', 'mentions', 'urls', 'segments', 'text'])
+
+_TOPIC_PATTERN = usual_pattern.WEIBO_PATTERN_TOPIC
+# 分组使得split同时返回链接
+_URL_SPLITTER = re.compile(r'({})'.format(usual_pattern.PATTERN_URL.pattern))
+_MENTION_SPLITTER = re.compile(r'@(.{1,15})[:：\ ]')
+_FULL_TEXT_MARK = '...全文'
+
+
+class WeiboParser(object):
+    '''
+    预编译的微博解析器，每条微博只扫描一次话题和链接，没有'#'，'.'或者'@'时直接跳过对应的扫描。
+    text 和 preprocess_weibo_content 的结果相同：
+      1. 话题拼接后不短于 max_topic_len 时，只保留话题
+      2. 否则把链接替换为分隔符，去掉结尾的"...全文"，按 // 切分转发链并去除每段中@的用户，和话题一起拼接
+    '''
+
+    def __init__(self, sentence_joint_chr='，', max_topic_len=15):
+        '''
+        :param sentence_joint_chr: 拼接话题和转发链的字符，同时用于替换链接
+        :param max_topic_len: 话题拼接后的长度不小于此值时，只保留话题
+        '''
+        self.sentence_joint_chr = sentence_joint_chr
+        self.max_topic_len = max_topic_len
+
+    def fingerprint(self):
+        return repr((self.sentence_joint_chr, self.max_topic_len))
+
+    def parse(self, text):
+        '''
+        :param text: 单条微博
+        :return: WeiboPost，话题过长时 text 只包含话题，其它字段仍然从全文解析
+        '''
+        topics = _TOPIC_PATTERN.findall(text) if '#' in text else []
+        topic = self.sentence_joint_chr.join(topics)
+        body, urls = self._replace_urls(text)
+        segments, mentions = self._split_chain(body)
+        if len(topic) >= self.max_topic_len:
+            cleaned = topic
+        else:
+            cleaned = self.sentence_joint_chr.join([topic] + segments if topic else segments)
+        return WeiboPost(topics, mentions, urls, segments, cleaned)
+
+    def clean(self, text):
+        '''
+        :param text: 单条微博
+        :return: 和 preprocess_weibo_content 相同的结果
+        '''
+        topics = _TOPIC_PATTERN.findall(text) if '#' in text else []
+        topic = self.sentence_joint_chr.join(topics)
+        if len(topic) >= self.max_topic_len:
+            return topic
+        segments = self._split_chain(self._replace_urls(text)[0])[0]
+        return self.sentence_joint_chr.join([topic] + segments if topic else segments)
+
+    def parse_batch(self, texts):
+        parse = self.parse
+        return [parse(str(text)) for text in texts]
+
+    def clean_batch(self, texts):
+        clean = self.clean
+        return [clean(str(text)) for text in texts]
+
+    def __call__(self, data, **kwargs):
+        '''
+        作为PreprocessPipeline中的处理函数使用，返回清洗后的正文
+        :param data: 单条文本或文本的list
+        :param kwargs: 吸收不相关参数
+        :return:
+        '''
+        if not data:
+            return data
+        if isinstance(data, str):
+            return self.clean(data)
+        return self.clean_batch(data)
+
+    def _replace_urls(self, text):
+        '''
+        :param text:
+        :return: (链接替换为分隔符并去掉"...全文"后的文本, 链接的list)
+        '''
+        # 链接中一定包含'.'
+        pieces = _URL_SPLITTER.split(text) if '.' in text else [text]
+        if len(pieces) == 1:
+            urls = []
+        else:
+            urls = pieces[1::2]
+            text = self.sentence_joint_chr.join(pieces[::2])
+        if text.endswith(_FULL_TEXT_MARK):
+            # 和原来的处理保持一致，多去掉了"...全文"之前的一个字符
+            text = text[:len(text) - 6]
+        return text, urls
+
+    @staticmethod
+    def _split_chain(body):
+        '''
+        :param body:
+        :return: (去除@的用户后转发链中非空的段, @的用户的list)
+        '''
+        segments = []
+        mentions = []
+        for segment in body.split('//'):
+            if '@' in segment:
+                pieces = _MENTION_SPLITTER.split(segment)
+                if len(pieces) > 1:
+                    mentions.extend(pieces[1::2])
+                    segment = ''.join(pieces[::2])
+            if segment:
+                segments.append(segment)
+        return segments, mentions
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import mmap
+import os
+import tempfile
+import unicodedata
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from nlpyutil import ch_utils, char_table
+from nlpyutil.preprocess import preprocess_remove_symbols, preprocess_split_on_punc, preprocess_strip_accents
+
+_TEXTS = ['ｈｅｌｌｏ　ｗｏｒｌｄ！１２３，你好python!', 'Café naïve ★☆$€ 「引号」…—',
+          ''.join(chr(code) for code in range(0, 0x3100))]
+
+
+class TranslateTableTest(unittest.TestCase):
+    def test_dbc_sbc(self):
+        for text in _TEXTS:
+            expected = ''.join(chr(32) if char == '　' else
+                               chr(ord(char) - 65248) if 65281 <= ord(char) <= 65374 else char for char in text)
+            self.assertEqual(ch_utils.str_to_dbc(text), expected)
+            expected = ''.join(chr(12288) if char == ' ' else
+                               chr(ord(char) + 65248) if 33 <= ord(char) <= 126 else char for char in text)
+            self.assertEqual(ch_utils.str_to_sbc(text), expected)
+        self.assertEqual(ch_utils.str_to_dbc(['ａｂ', 'ｃ']), 'abc')
+
+    def test_category_tables(self):
+        for text in _TEXTS:
+            self.assertEqual(preprocess_split_on_punc(text),
+                             ''.join(' ' if ch_utils.is_punctuation(char) else char for char in text))
+            self.assertEqual(preprocess_remove_symbols(text),
+                             ''.join(char for char in text if unicodedata.category(char) not in ('So', 'Sc')))
+            self.assertEqual(preprocess_strip_accents(text),
+                             ''.join(char for char in unicodedata.normalize('NFD', text)
+                                     if unicodedata.category(char) != 'Mn'))
+
+
+class CharTableTest(unittest.TestCase):
+    def test_predicates(self):
+        for code in range(0x10000):
+            char = chr(code)
+            self.assertEqual(ch_utils.is_punctuation(char), ch_utils._is_punctuation_slow(char), code)
+            self.assertEqual(ch_utils.is_whitespace(char), ch_utils._is_whitespace_slow(char), code)
+        self.assertTrue(ch_utils.is_whitespace('  a'))
+        self.assertEqual(char_table.flags_of('龥') & char_table.CJK, char_table.CJK)
+        self.assertEqual(char_table.flags_of('★'), char_table.SYMBOL)
+
+    def test_save_load(self):
+        flags = char_table.as_array()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'char_table.bin')
+            self.assertIsNone(char_table.load(path))
+            char_table.save(path, flags)
+            buffer = char_table.load(path)
+            self.assertEqual(buffer[64:], flags.tobytes())
+            buffer.close()
+            with open(path, 'r+b') as file:
+                file.seek(8)
+                file.write(b'0' * 32)
+            self.assertIsNone(char_table.load(path))
+
+    def test_cache_path(self):
+        flags = char_table.as_array().copy()
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(char_table, 'DEFAULT_PATH', os.path.join(directory, 'missing.bin')), \
+                mock.patch.object(char_table, 'CACHE_PATH', os.path.join(directory, 'cache', 'char_table.bin')), \
+                mock.patch.object(char_table, '_table', None), mock.patch.object(char_table, '_buffer', None):
+            # 没有预先生成的表文件时构建并写入缓存，之后的加载使用内存映射
+            np.testing.assert_array_equal(char_table.as_array(), flags)
+            self.assertTrue(os.path.exists(char_table.CACHE_PATH))
+            char_table._table = None
+            np.testing.assert_array_equal(char_table.as_array(), flags)
+            self.assertIsInstance(char_table._buffer, mmap.mmap)
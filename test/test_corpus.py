@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import tempfile
+import unittest
+
+from nlpyutil.corpus import CorpusProcessor
+from nlpyutil.preprocess import PreprocessPipeline, preprocess_text_to_simple
+
+
+class _Crash(Exception):
+    pass
+
+
+def _crash_on(word):
+    def func(data, **kwargs):
+        if word in data:
+            raise _Crash(data)
+        return data
+
+    return func
+
+
+class CorpusProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.dir.name, 'input.txt')
+        self.output_path = os.path.join(self.dir.name, 'output.txt')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _write(self, lines):
+        with open(self.input_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+
+    def _read(self):
+        with open(self.output_path, 'r', encoding='utf-8') as file:
+            return file.read().splitlines()
+
+    def test_text(self):
+        self._write(['臺灣{}'.format(i) for i in range(10)])
+        processor = CorpusProcessor(PreprocessPipeline([preprocess_text_to_simple]), batch_size=3)
+        self.assertEqual(processor.run(self.input_path, self.output_path), 10)
+        self.assertEqual(self._read(), ['台湾{}'.format(i) for i in range(10)])
+
+    def test_tsv_and_jsonl(self):
+        pipe = PreprocessPipeline([preprocess_text_to_simple])
+        self._write(['1\t臺灣', '2\t東亞'])
+        CorpusProcessor(pipe, input_format='tsv', column=1).run(self.input_path, self.output_path, resume=False)
+        self.assertEqual(self._read(), ['1\t台湾', '2\t东亚'])
+
+        self._write([json.dumps({'id': 1, 'text': '臺灣'}, ensure_ascii=False), ''])
+        CorpusProcessor(pipe, input_format='jsonl').run(self.input_path, self.output_path, resume=False)
+        self.assertEqual(self._read(), [json.dumps({'id': 1, 'text': '台湾'}, ensure_ascii=False), ''])
+
+    def test_resume(self):
+        lines = ['臺灣{}'.format(i) for i in range(10)] + ['崩潰'] + ['東亞{}'.format(i) for i in range(10)]
+        self._write(lines)
+        crashing = PreprocessPipeline([_crash_on('崩潰'), preprocess_text_to_simple])
+        processor = CorpusProcessor(crashing, batch_size=2, checkpoint_interval=4)
+        with self.assertRaises(_Crash):
+            processor.run(self.input_path, self.output_path)
+        with open(self.output_path + '.checkpoint', 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file)['records'], 8)
+
+        processor = CorpusProcessor(PreprocessPipeline([preprocess_text_to_simple]), batch_size=2)
+        self.assertEqual(processor.run(self.input_path, self.output_path), len(lines))
+        self.assertEqual(self._read(), ['台湾{}'.format(i) for i in range(10)] + ['崩溃'] +
+                         ['东亚{}'.format(i) for i in range(10)])
+        # 已经处理完成的任务再次执行不会重复处理
+        self.assertEqual(processor.run(self.input_path, self.output_path), len(lines))
+        self.assertEqual(len(self._read()), len(lines))
+
+    def test_resume_without_output(self):
+        self._write(['臺灣{}'.format(i) for i in range(10)] + ['崩潰'])
+        crashing = PreprocessPipeline([_crash_on('崩潰'), preprocess_text_to_simple])
+        with self.assertRaises(_Crash):
+            CorpusProcessor(crashing, batch_size=2, checkpoint_interval=4).run(self.input_path, self.output_path)
+        processor = CorpusProcessor(PreprocessPipeline([preprocess_text_to_simple]), batch_size=2)
+
+        with open(self.output_path + '.checkpoint', 'r', encoding='utf-8') as file:
+            output_offset = json.load(file)['output_offset']
+        with open(self.output_path, 'r+b') as file:
+            file.truncate(output_offset - 1)
+        with self.assertRaises(ValueError):
+            processor.run(self.input_path, self.output_path)
+        os.remove(self.output_path)
+        with self.assertRaises(ValueError):
+            processor.run(self.input_path, self.output_path)
+        self.assertFalse(os.path.exists(self.output_path))
+        # 不从断点继续时重新处理
+        self.assertEqual(processor.run(self.input_path, self.output_path, resume=False), 11)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from nlpyutil.dedup import MinHasher, NearDuplicateFilter, _universal_hash
+from nlpyutil.preprocess import PreprocessPipeline, preprocess_text_to_simple
+
+_BASE = '今天北京的天气非常好，我们一起去公园散步吧，顺便看看湖边新开的花，晚上再去吃火锅。'
+
+
+class DedupTest(unittest.TestCase):
+    def test_batch_signatures(self):
+        hasher = MinHasher(num_perm=64)
+        texts = [_BASE, '', '短', _BASE + '！']
+        signatures = hasher.signatures(texts)
+        self.assertEqual(signatures.shape, (4, 64))
+        for text, signature in zip(texts, signatures):
+            np.testing.assert_array_equal(hasher.signature(text), signature)
+        self.assertGreater(np.mean(signatures[0] == signatures[3]), 0.8)
+
+    def test_filter(self):
+        texts = [_BASE, '完全不同的另外一段文字，讲的是机器学习和自然语言处理。', _BASE + '！', _BASE, '']
+        dedup = NearDuplicateFilter(threshold=0.8, batch_size=2)
+        self.assertEqual(list(dedup.tag(texts)), [(_BASE, None), (texts[1], None), (texts[2], 0),
+                                                  (_BASE, 0), ('', None)])
+
+    def test_pipeline_stage(self):
+        pipe = PreprocessPipeline([NearDuplicateFilter(), preprocess_text_to_simple])
+        self.assertEqual(pipe.process([_BASE, _BASE + '。', '臺灣']), [_BASE, '', '台湾'])
+
+    def test_pipeline_stream_batches(self):
+        dedup = NearDuplicateFilter()
+        pipe = PreprocessPipeline([preprocess_text_to_simple, dedup])
+        pipe.enable_stats()
+        texts = [_BASE, '臺灣', _BASE + '。', '台湾', '東亞']
+        with mock.patch.object(dedup._hasher, 'signatures', wraps=dedup._hasher.signatures) as signatures:
+            self.assertEqual(list(pipe.process_stream(texts, batch_size=3)), [_BASE, '台湾', '', '', '东亚'])
+        self.assertEqual([len(call.args[0]) for call in signatures.call_args_list], [3, 2])
+        self.assertEqual([(stage.calls, stage.docs) for stage in pipe.stats], [(5, 5), (2, 5)])
+
+    def test_universal_hash(self):
+        hasher = MinHasher(num_perm=16)
+        hashes = np.array([0, 1, 12345, (1 << 32) - 1], dtype=np.uint64)
+        prime = (1 << 61) - 1
+        for a, b in zip(hasher._a, hasher._b):
+            expected = [(int(a) * int(value) + int(b)) % prime for value in hashes]
+            self.assertEqual([int(value) for value in _universal_hash(a, b, hashes)], expected)
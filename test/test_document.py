@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pickle
+import unittest
+
+import numpy as np
+
+from nlpyutil import char_table
+from nlpyutil.document import Document
+from nlpyutil.lexicon import Lexicon
+from nlpyutil.preprocess import preprocess_segment_document, preprocess_text_segmentation, segment_batch
+
+
+class DocumentTest(unittest.TestCase):
+    def test_offsets(self):
+        document = Document('ab,cd ef', [[0, 5], [6, 8]])
+        self.assertEqual(document.spans.dtype, np.int32)
+        self.assertEqual(document.tokens(), ['ab,cd', 'ef'])
+        self.assertEqual(document.starts.tolist(), [0, 6])
+        split = document.remove_flags(char_table.PUNCTUATION)
+        self.assertIs(split.text, document.text)
+        self.assertEqual(split.tokens(), ['ab', 'cd', 'ef'])
+        self.assertEqual(document.remove_tokens({'ef'}).to_text('|'), 'ab,cd')
+        self.assertEqual(document.remove_spans([[1, 4]]).tokens(), ['a', 'd', 'ef'])
+        self.assertEqual(len(Document('').remove_rare()), 0)
+
+    def test_encode(self):
+        document = Document('北京天安门', [[0, 2], [2, 5]]).encode({'北京': 3})
+        self.assertEqual(document.token_ids.tolist(), [3, 0])
+        self.assertEqual(document.select(np.array([False, True])).token_ids.tolist(), [0])
+        self.assertEqual(pickle.loads(pickle.dumps(document)), document)
+
+    def test_segmentation(self):
+        texts = ['我爱北京天安门！', '', '今天，天气 很好呀。']
+        documents = segment_batch(texts, output='document')
+        self.assertEqual([document.to_text() for document in documents],
+                         [preprocess_text_segmentation(text) for text in texts])
+        document = preprocess_segment_document('我爱北京天安门广场', remove_stopwords=False,
+                                               lexicon=Lexicon(['天安门广场']))
+        self.assertEqual(document.tokens(), ['我', '爱', '北京'])
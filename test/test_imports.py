@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# 只在真正使用时才允许导入的重量级依赖
+_HEAVY_MODULES = {'pandas', 'yaml', 'psutil', 'jieba', 'langdetect'}
+# import nlpyutil 的时间上限（秒），取多次运行的最小值以减少机器负载的影响
+_IMPORT_BUDGET = 0.3
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module} as target
+elapsed = time.perf_counter() - start
+stdlib = set(getattr(sys, 'stdlib_module_names', ())) | {{'__main__', '__mp_main__', '_distutils_hack'}}
+modules = {{name.split('.')[0] for name in sys.modules}} - stdlib
+symbols = [name for name in dir(target) if not name.startswith('_') and type(getattr(target, name)).__name__ != 'module']
+print(json.dumps({{'elapsed': elapsed, 'modules': sorted(modules), 'symbols': sorted(symbols)}}))
+'''
+
+_SYMBOL_PROBE = '''
+import json, sys
+from {module} import {symbol}
+print(json.dumps(sorted(sys.modules)))
+'''
+
+
+def _run(code, *options):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    process = subprocess.run([sys.executable] + list(options) + ['-c', code], env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return json.loads(process.stdout.decode('utf-8').strip().splitlines()[-1]), process.stderr.decode('utf-8')
+
+
+def _probe(module):
+    '''
+    在新的解释器中导入模块
+    :param module:
+    :return: 导入耗时，导入后已加载的非标准库顶层模块，以及模块的公开对象
+    '''
+    return _run(_PROBE.format(module=module))[0]
+
+
+def _probe_symbols(module, symbols):
+    '''
+    每个公开对象在单独的新解释器中用 from module import symbol 导入
+    :param module:
+    :param symbols:
+    :return: 每个公开对象导入后已加载的重量级依赖，以及这些依赖的累计导入耗时（微秒，来自 -X importtime）
+    '''
+    heavy = {}
+    for symbol in symbols:
+        loaded, importtime = _run(_SYMBOL_PROBE.format(module=module, symbol=symbol), '-X', 'importtime')
+        modules = {name for name in loaded if name.split('.')[0] in _HEAVY_MODULES}
+        if modules:
+            # 每行格式为 import time: self | cumulative | name
+            costs = [line.split('|') for line in importtime.splitlines() if line.startswith('import time:')]
+            heavy[symbol] = {name.strip(): int(cumulative) for _, cumulative, name in costs[1:]
+                             if name.strip() in modules}
+    return heavy
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_package_import(self):
+        results = [_probe('nlpyutil') for _ in range(3)]
+        self.assertLessEqual(set(results[0]['modules']), {'nlpyutil', 'zhon', 'six'})
+        self.assertLess(min(result['elapsed'] for result in results), _IMPORT_BUDGET)
+        # 每个公开对象都不应该额外加载依赖
+        self.assertIn('SdArgumentParser', results[0]['symbols'])
+        self.assertEqual(_probe_symbols('nlpyutil', results[0]['symbols']), {})
+
+    def test_preprocess_import(self):
+        result = _probe('nlpyutil.preprocess')
+        self.assertFalse(_HEAVY_MODULES & set(result['modules']))
+        self.assertLessEqual(set(result['modules']), {'nlpyutil', 'zhon', 'six', 'numpy', 'opencc'})
+        self.assertIn('preprocess_text_segmentation', result['symbols'])
+        self.assertEqual(_probe_symbols('nlpyutil.preprocess', result['symbols']), {})
+
+    def test_probe_detects_heavy_import(self):
+        # 导入时就加载依赖的对象会被列出，以及依赖的导入耗时
+        heavy = _probe_symbols('jieba', ['Tokenizer'])
+        self.assertIn('jieba', heavy['Tokenizer'])
+        self.assertGreater(heavy['Tokenizer']['jieba'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
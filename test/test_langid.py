@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pickle
+import unittest
+
+from nlpyutil.langid import SCRIPT_HAN, SCRIPT_KANA, SCRIPT_LATIN, LanguageIdentifier, script_histogram
+from nlpyutil.preprocess import preprocess_filter_other_language
+
+
+class LanguageIdentifierTest(unittest.TestCase):
+    def test_histogram(self):
+        histogram, traditional = script_histogram(['今天はabc', '', '臺灣'])
+        self.assertEqual(histogram[0, SCRIPT_HAN], 2)
+        self.assertEqual(histogram[0, SCRIPT_KANA], 1)
+        self.assertEqual(histogram[0, SCRIPT_LATIN], 3)
+        self.assertEqual(histogram[1].sum(), 0)
+        self.assertEqual(traditional.tolist(), [0, 0, 2])
+
+    def test_detect(self):
+        identifier = LanguageIdentifier(seed=0)
+        texts = ['今天天气很好，我们一起去公园散步吧。', '今日はいい天気ですね。散歩に行きましょう。',
+                 '안녕하세요 만나서 반갑습니다', 'Hello world, this is an English sentence.', '', '12345']
+        expected = ['zh-cn', 'ja', 'ko', 'en', None, None]
+        self.assertEqual(identifier.detect_batch(texts), expected)
+        self.assertEqual(identifier.detect(texts[3]), 'en')
+        self.assertEqual(pickle.loads(pickle.dumps(identifier)).detect_batch(texts), expected)
+
+    def test_filter(self):
+        identifier = LanguageIdentifier()
+        self.assertEqual(identifier.is_language_batch(['今天天气很好', 'Hello world', '臺灣是位於東亞的島嶼'], 'zh-cn'),
+                         [True, False, False])
+        self.assertEqual(preprocess_filter_other_language(['今天天气很好', 'Hello world']), ['今天天气很好', ''])
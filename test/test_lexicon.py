@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from nlpyutil.lexicon import Lexicon
+from nlpyutil.preprocess import PreprocessPipeline, preprocess_text_segmentation
+
+
+class LexiconTest(unittest.TestCase):
+    def test_find_all(self):
+        lexicon = Lexicon(['he', 'she', 'his', 'hers', ''])
+        self.assertEqual(len(lexicon), 4)
+        self.assertEqual(lexicon.find_all('ushers'), [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')])
+        self.assertTrue(lexicon.contains_any('this'))
+        self.assertFalse(lexicon.contains_any('ello'))
+
+    def test_remove(self):
+        lexicon = Lexicon(['ab', 'bc', 'abcd', 'b'])
+        self.assertEqual(lexicon.spans('abcd xbcx b'), [[0, 4], [6, 8], [10, 11]])
+        self.assertEqual(lexicon.remove('abcd xbcx b'), ' xx ')
+        self.assertEqual(lexicon.remove('xabbcx', repl='|'), 'x|x')
+        self.assertEqual(lexicon.remove('xyz'), 'xyz')
+
+    def test_phrases_across_segmentation(self):
+        lexicon = Lexicon(['天安门广场'])
+        lexicon.add_words(['北京'])
+        self.assertEqual(lexicon(['我在北京天安门广场', '']), ['我在', ''])
+        self.assertEqual(preprocess_text_segmentation('我爱北京天安门广场散步', remove_stopwords=False, lexicon=lexicon),
+                         '我 爱 散步')
+        pipe = PreprocessPipeline([preprocess_text_segmentation], remove_stopwords=False, lexicon=lexicon)
+        self.assertEqual(pipe.process(['北京天安门广场']), [''])
+
+    def test_default(self):
+        lexicon = Lexicon.default()
+        self.assertIn('一些', lexicon)
+        self.assertEqual(lexicon.remove('一些'), '')
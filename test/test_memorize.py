@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+import unittest
+
+from nlpyutil.memorize import memoize
+
+
+class Counter(object):
+    def __init__(self):
+        self.x = 1
+
+    @memoize()
+    def get(self):
+        return self.x
+
+
+class MemoizeTest(unittest.TestCase):
+    def test_cache_and_info(self):
+        calls = []
+
+        @memoize()
+        def square(x):
+            '''平方'''
+            calls.append(x)
+            return x * x
+
+        self.assertEqual([square(2), square(2), square(3)], [4, 4, 9])
+        self.assertEqual(calls, [2, 3])
+        self.assertEqual(square.__name__, 'square')
+        self.assertEqual(square.__doc__, '平方')
+        info = square.cache_info()
+        self.assertEqual((info.hits, info.misses, info.maxsize, info.currsize), (1, 2, None, 2))
+        square.cache_clear()
+        self.assertEqual(square.cache_info().currsize, 0)
+        square(2)
+        self.assertEqual(calls, [2, 3, 2])
+
+    def test_functions_do_not_share_cache(self):
+        cache = memoize(maxsize=1)
+
+        @cache
+        def first(x):
+            return 'first'
+
+        @cache
+        def second(x):
+            return 'second'
+
+        self.assertEqual((first(1), second(1)), ('first', 'second'))
+        self.assertEqual(first.cache_info().currsize, 1)
+        self.assertEqual(second.cache_info().currsize, 1)
+
+    def test_lru(self):
+        calls = []
+
+        @memoize(maxsize=2)
+        def identity(x):
+            calls.append(x)
+            return x
+
+        for x in (1, 2, 1, 3, 1, 2):
+            identity(x)
+        # 3 淘汰了 2，2 淘汰了 3
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual(identity.cache_info().currsize, 2)
+
+    def test_lfu(self):
+        calls = []
+
+        @memoize(maxsize=2, policy='lfu')
+        def identity(x):
+            calls.append(x)
+            return x
+
+        for x in (1, 1, 2, 3, 2, 1):
+            identity(x)
+        # 3 淘汰了使用次数最少的 2，2 淘汰了 3
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual(identity.cache_info().currsize, 2)
+
+    def test_duration_frees_entries(self):
+        calls = []
+
+        @memoize(duration=0.05)
+        def identity(x):
+            calls.append(x)
+            return x
+
+        for x in range(100):
+            identity(x)
+        self.assertEqual(identity.cache_info().currsize, 100)
+        time.sleep(0.1)
+        self.assertEqual(identity.cache_info().currsize, 0)
+        identity(1)
+        self.assertEqual(calls[-1], 1)
+        self.assertEqual(len(calls), 101)
+
+    def test_keys(self):
+        calls = []
+
+        @memoize()
+        def describe(*args, **kwargs):
+            calls.append((args, kwargs))
+            return repr((args, kwargs))
+
+        describe(1)
+        describe((1,))
+        describe(1, 2)
+        describe(1.0, 2)
+        describe(1, b=2)
+        describe(1, b=2)
+        describe([1, 2])
+        describe([1, 2])
+        describe({'a': [1]}, b=[2])
+        describe({'a': [1]}, b=[2])
+        self.assertEqual(calls, [((1,), {}), (((1,),), {}), ((1, 2), {}), ((1.0, 2), {}), ((1,), {'b': 2}),
+                                 (([1, 2],), {}), (({'a': [1]},), {'b': [2]})])
+        self.assertEqual(describe.cache_info().hits, 3)
+
+        @memoize()
+        def identity(x):
+            return x
+
+        self.assertEqual([type(identity(x)) for x in (1, 1.0, True, 1)], [int, float, bool, int])
+        self.assertEqual(identity.cache_info().hits, 1)
+
+        @memoize(typed=False)
+        def untyped_pair(x, y):
+            return x, y
+
+        self.assertEqual([untyped_pair(x, 2) for x in (1.0, 1, True)], [(1.0, 2)] * 3)
+        self.assertEqual(type(untyped_pair(True, 2)[0]), float)
+
+    def test_object_state(self):
+        counter = Counter()
+        self.assertEqual(counter.get(), 1)
+        counter.x = 2
+        self.assertEqual(counter.get(), 2)
+        counter.x = 1
+        self.assertEqual(counter.get(), 1)
+        self.assertEqual(counter.get.cache_info().hits, 1)
+
+    def test_invalid_params(self):
+        with self.assertRaises(ValueError):
+            memoize(maxsize=0)
+        with self.assertRaises(ValueError):
+            memoize(policy='fifo')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,7 +21,16 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import asyncio
+import json
+import random
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from nlpyutil.async_pipeline import AsyncPreprocessor
 from nlpyutil.preprocess import *
+from nlpyutil.preprocess import _DUPLICATE_SCAN_MIN_LEN, _collapse_repeats, _duplicate_pattern
 
 
 def test_process():
@@ -46,5 +55,165 @@ def test_process():
     '''
 
 
+def test_process_stream():
+    pipe = PreprocessPipeline(
+        func_list=[
+            preprocess_remove_not_chinese,
+            preprocess_text_to_simple,
+            preprocess_text_to_dbc])
+    texts = [' kǒu yīn  kəmˈpjutɚ,臺灣是位於東亞、it is great太平洋西北側的島嶼NOCE',
+             ' kǒu yīn  kəmˈpjutɚ, https://www.baidu.com,wangkun@eversec.com',
+             '']
+    expected = pipe.process(texts)
+    result = pipe.process_stream((text for text in texts), batch_size=2)
+    assert not isinstance(result, list)
+    assert list(result) == expected
+    assert list(pipe.process_stream(texts[0])) == [pipe.process(texts[0])]
+
+
+def test_process_parallel():
+    pipe = PreprocessPipeline(
+        func_list=[
+            preprocess_text_to_simple,
+            preprocess_text_segmentation])
+    texts = ['臺灣是位於東亞、太平洋西北側的島嶼{}'.format(i) for i in range(50)]
+    expected = pipe.process(texts)
+    with tempfile.TemporaryDirectory() as directory:
+        pipe.set_tokenizer(cache_dir=directory)
+        assert pipe.process(texts, workers=2, chunksize=7) == expected
+        assert list(pipe.process_stream(iter(texts), workers=2, chunksize=3)) == expected
+
+
+def test_segment_batch():
+    texts = ['我爱北京天安门！', '', '臺灣是位於東亞的島嶼']
+    expected = [preprocess_text_segmentation(text) for text in texts]
+    assert segment_batch(iter(texts), output='text') == expected
+    tokens = segment_batch(texts, workers=2, chunksize=1)
+    assert [' '.join(terms) for terms in tokens] == expected
+    flat, offsets = segment_batch(texts, output='flat')
+    assert [flat[start:end] for start, end in zip(offsets[:-1], offsets[1:])] == tokens
+
+
+def test_aprocess():
+    pipe = PreprocessPipeline(
+        func_list=[
+            preprocess_remove_not_chinese,
+            preprocess_text_to_simple])
+    texts = ['臺灣是位於東亞、it is great太平洋西北側的島嶼{}'.format(i) for i in range(20)]
+    expected = pipe.process(texts)
+
+    async def run():
+        processor = AsyncPreprocessor(pipe, max_concurrency=4, max_batch_size=3)
+        single = await asyncio.gather(*[processor.aprocess(text) for text in texts])
+        return single, await pipe.aprocess(texts), await pipe.aprocess(texts[0])
+
+    single, batch, one = asyncio.run(run())
+    assert single == expected
+    assert batch == expected
+    assert one == expected[0]
+
+
+def test_aprocess_batching():
+    pipe = PreprocessPipeline(func_list=[preprocess_remove_not_chinese])
+    pipe.enable_stats()
+    texts = ['臺灣是位於東亞、it is great{}'.format(i) for i in range(200)]
+
+    async def run():
+        with ThreadPoolExecutor(8) as executor:
+            processor = AsyncPreprocessor(pipe, executor=executor, max_batch_size=2, max_delay=60)
+            # 没有批次在处理中时不等待 max_delay
+            first = await asyncio.wait_for(processor.aprocess(texts[0]), 10)
+            rest = await asyncio.wait_for(asyncio.gather(*[processor.aprocess(text) for text in texts[1:]]), 10)
+            return [first] + list(rest)
+
+    assert asyncio.run(run()) == pipe.process(texts)
+    # 多个批次在线程池中同时记录统计信息
+    assert pipe.stats[0].docs == len(texts) * 2
+
+
+def test_stats():
+    pipe = PreprocessPipeline(
+        func_list=[
+            preprocess_remove_not_chinese,
+            preprocess_text_to_simple])
+    assert pipe.stats is None
+    pipe.enable_stats()
+    texts = ['臺灣是位於東亞、it is great', '太平洋西北側的島嶼']
+    pipe.process(texts)
+    list(pipe.process_stream(texts))
+    pipe.process(texts, workers=2, chunksize=1)
+    stats = pipe.stats
+    assert [stage.name for stage in stats] == ['preprocess_remove_not_chinese', 'preprocess_text_to_simple']
+    assert stats[0].calls == 1 + 2 + 2
+    assert stats[0].docs == 6
+    assert stats[0].chars_in == 3 * sum(len(text) for text in texts)
+    assert stats[0].chars_out == stats[1].chars_in
+    assert json.loads(stats.to_json())['stages'][1]['docs'] == 6
+    assert 'nlpyutil_pipeline_docs_total{stage="preprocess_text_to_simple",index="1"} 6' in stats.to_prometheus()
+    pipe.enable_stats(False)
+    assert pipe.stats is None
+
+
+def test_remove_duplacte_words():
+    assert preprocess_remove_duplacte_words('東亞亞亞、、、it----.... is') == '東亞、it-. is'
+    assert preprocess_remove_duplacte_words(['哈哈哈哈', '1111', '转发抽奖转发抽奖转发抽奖！']) == ['哈', '1111', '转发抽奖！']
+    rng = random.Random(0)
+    for _ in range(300):
+        alphabet = 'ab1I、哈'[:rng.randint(2, 6)]
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        # 单元长度上限不小于文本长度的1/3时，和不限制单元长度的结果相同
+        assert preprocess_remove_duplacte_words(text, max_unit_len=20) == \
+            preprocess_remove_duplacte_words(text, max_unit_len=None)
+    for _ in range(100):
+        text = ''.join(rng.choice('ab1I、哈') for _ in range(rng.randint(500, 3000)))
+        pattern = re.compile(r'([^0-9I]{1,8})\1{2,}')
+        expected = text
+        for _ in range(6):
+            collapsed = pattern.sub(r'\1', expected)
+            if len(collapsed) == len(expected):
+                break
+            expected = collapsed
+        assert preprocess_remove_duplacte_words(text, max_unit_len=8) == expected
+    # 短文本默认不限制单元长度，长文本默认使用 DUPLICATE_UNIT_MAX_LEN
+    unit = '转发这条微博并关注三位好友就有机会抽中最新款手机一部，截止到本周五晚上八点'
+    assert preprocess_remove_duplacte_words(unit * 3) == unit
+    assert preprocess_remove_duplacte_words(unit * 3 + 'a' * _DUPLICATE_SCAN_MIN_LEN) == unit * 3 + 'a'
+
+
+class _CountingPattern(object):
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.matches = 0
+
+    def match(self, data, pos):
+        self.matches += 1
+        return self.pattern.match(data, pos)
+
+
+def test_remove_duplacte_words_worst_case():
+    # 长文本只在可能出现重复的位置上尝试匹配，耗时见 benchmarks 中的 spam 语料
+    rng = random.Random(0)
+    hanzi = [chr(code) for code in range(0x4e00, 0x4e00 + 500)]
+    unit = ''.join(rng.choice(hanzi) for _ in range(30))
+    cases = [
+        (''.join(rng.choice(hanzi) for _ in range(100000)), 5),
+        (''.join(rng.choice(hanzi) for _ in range(50000)) * 2, 5),
+        ((unit * 2 + '!') * 1600, 0),
+        # 每段匹配成功一次，段尾的少量候选位置上匹配失败
+        (('哈' * 19 + 'I') * 5000, 3 * 5000),
+    ]
+    pattern = _duplicate_pattern(DUPLICATE_UNIT_MAX_LEN)
+    for text, max_matches in cases:
+        counting = _CountingPattern(pattern)
+        result = _collapse_repeats(text, counting, DUPLICATE_UNIT_MAX_LEN)
+        assert counting.matches <= max_matches
+        if max_matches:
+            assert result == pattern.sub(r'\1', text)
+    # 默认参数处理长文本时同样限制单元长度
+    text = cases[0][0]
+    assert preprocess_remove_duplacte_words(text) == \
+        preprocess_remove_duplacte_words(text, max_unit_len=DUPLICATE_UNIT_MAX_LEN)
+
+
 if __name__ == '__main__':
     test_process()
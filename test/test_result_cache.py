@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import tempfile
+import unittest
+
+from nlpyutil.lexicon import Lexicon
+from nlpyutil.preprocess import PreprocessPipeline, preprocess_text_to_simple
+from nlpyutil.result_cache import ResultCache, pipeline_fingerprint
+
+_calls = []
+
+
+def _counting_stage(data, **kwargs):
+    _calls.append(data)
+    return data
+
+
+def _chars_stage(data, **kwargs):
+    return list(data)
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        del _calls[:]
+
+    def test_memory_tier(self):
+        pipe = PreprocessPipeline([_counting_stage, preprocess_text_to_simple])
+        cache = ResultCache(maxsize=2)
+        pipe.set_cache(cache)
+        texts = ['臺灣', '東亞', '臺灣', '臺灣', '島嶼', '臺灣']
+        self.assertEqual(pipe.process(texts), ['台湾', '东亚', '台湾', '台湾', '岛屿', '台湾'])
+        self.assertEqual(_calls, ['臺灣', '東亞', '島嶼'])
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (3, 3, 2))
+        self.assertEqual(list(pipe.process_stream(['島嶼'])), ['岛屿'])
+        self.assertEqual(cache.info().hits, 4)
+
+    def test_fingerprint(self):
+        cache = ResultCache()
+        first = PreprocessPipeline([_counting_stage])
+        first.set_cache(cache)
+        second = PreprocessPipeline([_counting_stage], joint='|')
+        second.set_cache(cache)
+        first.process('臺灣')
+        second.process('臺灣')
+        self.assertEqual(len(_calls), 2)
+
+    def test_stable_fingerprint(self):
+        # 不依赖对象地址，多次运行之间相同
+        first = pipeline_fingerprint([_counting_stage], {'lexicon': Lexicon(['臺灣', '東亞'])})
+        self.assertEqual(pipeline_fingerprint([_counting_stage], {'lexicon': Lexicon(['東亞', '臺灣'])}), first)
+        self.assertNotEqual(pipeline_fingerprint([_counting_stage], {'lexicon': Lexicon(['臺灣'])}), first)
+        self.assertEqual(pipeline_fingerprint([Lexicon(['臺灣'])], {'words': {'b', 'a'}}),
+                         pipeline_fingerprint([Lexicon(['臺灣'])], {'words': {'a', 'b'}}))
+        with self.assertRaises(ValueError):
+            PreprocessPipeline([_counting_stage], option=object()).set_cache(ResultCache())
+
+    def test_functions_with_same_name(self):
+        cache = ResultCache()
+        upper = PreprocessPipeline([lambda data, **kwargs: data.upper()])
+        upper.set_cache(cache)
+        lower = PreprocessPipeline([lambda data, **kwargs: data.lower()])
+        lower.set_cache(cache)
+        self.assertEqual((upper.process('AbC'), lower.process('AbC')), ('ABC', 'abc'))
+
+        def make(times):
+            return lambda data, **kwargs: data * times
+
+        once, twice = PreprocessPipeline([make(1)]), PreprocessPipeline([make(2)])
+        once.set_cache(cache)
+        twice.set_cache(cache)
+        self.assertEqual((once.process('ab'), twice.process('ab')), ('ab', 'abab'))
+        self.assertEqual(pipeline_fingerprint([make(2)], {}), pipeline_fingerprint([make(2)], {}))
+
+    def test_cached_value_copied(self):
+        pipe = PreprocessPipeline([_chars_stage])
+        pipe.set_cache(ResultCache())
+        pipe.process('臺灣').append('!')
+        result = pipe.process('臺灣')
+        self.assertEqual(result, ['臺', '灣'])
+        result.clear()
+        self.assertEqual(pipe.process('臺灣'), ['臺', '灣'])
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as dir_name:
+            path = os.path.join(dir_name, 'cache.sqlite')
+            pipe = PreprocessPipeline([_counting_stage, preprocess_text_to_simple])
+            pipe.set_cache(ResultCache(disk_path=path))
+            pipe.process(['臺灣', '東亞'])
+            pipe.cache.close()
+
+            other = PreprocessPipeline([_counting_stage, preprocess_text_to_simple])
+            cache = ResultCache(disk_path=path)
+            other.set_cache(cache)
+            self.assertEqual(other.process(['東亞', '臺灣']), ['东亚', '台湾'])
+            self.assertEqual(len(_calls), 2)
+            self.assertEqual(cache.info().disk_hits, 2)
+            self.assertEqual(other.process(['臺灣'] * 3, workers=2, chunksize=1), ['台湾'] * 3)
+            cache.close()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import random
+import re
+import unittest
+
+from benchmarks.cases import _chained_cleanup
+from nlpyutil import usual_pattern
+from nlpyutil.preprocess import (preprocess_clean_text, preprocess_remove_html_marks, preprocess_remove_links,
+                                 preprocess_replace_whitespace, preprocess_strip_blanks)
+from nlpyutil.substitution import SubstitutionProgram
+
+
+class SubstitutionProgramTest(unittest.TestCase):
+    def test_replacement_per_rule(self):
+        program = SubstitutionProgram([(re.compile(r'<[^>]+>', re.S), ''),
+                                       (r'\d+', lambda match: str(len(match.group()))),
+                                       (usual_pattern.PATTERN_SPACES, '_')])
+        self.assertEqual(program.sub('<p\n>abc 12345\tde</p>'), 'abc_5_de')
+        self.assertEqual(program(['<b>1</b>', 'x  y']), ['1', 'x_y'])
+
+    def test_backreference(self):
+        with self.assertRaises(ValueError):
+            SubstitutionProgram([(r'(a)\1', '')])
+
+    def test_clean_text(self):
+        texts = ['详情 wangkun@eversec.com  https://www.baidu.com/s?wd=1 请看<br/>\n\n<p>正文</p>  结尾',
+                 'great. data@example.com https://www.example.com/is?id=9559 ３Ｃ',
+                 '<div class="a">  </div> 中文']
+        for text in texts:
+            chained = preprocess_replace_whitespace(preprocess_remove_html_marks(preprocess_remove_links(text)))
+            self.assertEqual(preprocess_clean_text(text), chained)
+            self.assertEqual(preprocess_clean_text(text, repl=''), preprocess_strip_blanks(chained))
+
+    def test_clean_text_random(self):
+        # 链接、邮件地址、标签和各种空白相邻或互相嵌套的片段
+        fragments = ['a', 'Zb', '中文', '1', '.', '@', '-', '_', '/', ':', '<', '>', '"', '=', '?', '%',
+                     ' ', '\t', '\n', '\r', '\xa0', '\u2003', '\u3000', '\u200b', '\u2010',
+                     'http://', 'www.', '.com', 'mailto:', 'john.doe@gmail.com', ' x@y.cn ', '<br/>']
+        rnd = random.Random(0)
+        for _ in range(20000):
+            text = ''.join(rnd.choice(fragments) for _ in range(rnd.randint(0, 20)))
+            self.assertEqual(preprocess_clean_text(text, repl=''), _chained_cleanup(text), repr(text))
+            chained = preprocess_replace_whitespace(preprocess_remove_html_marks(preprocess_remove_links(text)))
+            self.assertEqual(preprocess_clean_text(text), chained, repr(text))
+
+    def test_clean_text_dotted_email(self):
+        self.assertEqual(preprocess_clean_text('联系 john.doe@gmail.com 或 <x.com>'), '联系 john. 或 <>')
+        self.assertEqual(preprocess_clean_text('a\u2003\t<b>\u3000 b'), 'a  b')
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pickle
+import random
+import unittest
+
+from opencc import OpenCC
+
+from nlpyutil.t2s import T2SConverter, load_dictionary
+from nlpyutil.preprocess import preprocess_text_to_simple
+
+
+class T2SConverterTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.opencc = OpenCC('t2s')
+        cls.converter = T2SConverter()
+
+    def test_same_as_opencc(self):
+        phrases = list(load_dictionary('TSPhrases'))
+        characters = list(load_dictionary('TSCharacters'))
+        rng = random.Random(0)
+        pool = phrases + characters[:500] + list('的一是不了我他这个们，。 -\n') * 20
+        texts = phrases + ['', '今天天气很好', '臺灣是位於東亞的島嶼', '我們瞭解到他沈默了', '答覆：回覆']
+        texts += [''.join(rng.choice(pool) for _ in range(rng.randint(1, 10))) for _ in range(2000)]
+        expected = [self.opencc.convert(text) for text in texts]
+        self.assertEqual([self.converter.convert(text) for text in texts], expected)
+        self.assertEqual(self.converter.convert_batch(texts), expected)
+
+    def test_skip_simplified(self):
+        self.assertFalse(self.converter.needs_conversion('今天天气很好，我们一起去公园'))
+        self.assertTrue(self.converter.needs_conversion('臺灣'))
+        self.assertTrue(self.converter.needs_conversion('明瞭'))
+        text = '已经是简体的文本'
+        self.assertIs(self.converter.convert(text), text)
+
+    def test_pipeline_function(self):
+        self.assertEqual(preprocess_text_to_simple(['臺灣', '', '简体']), ['台湾', '', '简体'])
+        self.assertEqual(preprocess_text_to_simple(''), '')
+        self.assertEqual(pickle.loads(pickle.dumps(self.converter)).convert('東亞'), '东亚')
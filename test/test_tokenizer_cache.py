@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import jieba
+
+from nlpyutil.tokenizer_cache import dictionary_fingerprint, load_tokenizer
+
+
+class TokenizerCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        self.user_dict = os.path.join(self.temp_dir.name, 'user.txt')
+        with open(self.user_dict, 'w', encoding='utf-8') as file:
+            file.write('云计算平台 100 n\n')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_reload_from_cache(self):
+        text = '我们在云计算平台上部署了清华大学的服务'
+        built = load_tokenizer(jieba.Tokenizer(), user_dicts=[self.user_dict], cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertIn('云计算平台', built.lcut(text))
+
+        loaded = load_tokenizer(jieba.Tokenizer(), user_dicts=[self.user_dict], cache_dir=self.cache_dir)
+        self.assertTrue(loaded.initialized)
+        self.assertEqual(loaded.lcut(text), built.lcut(text))
+        self.assertEqual(loaded.total, built.total)
+        self.assertEqual(loaded.user_word_tag_tab, {'云计算平台': 'n'})
+        # 同一个分词器重复加载时直接返回
+        self.assertIs(load_tokenizer(loaded, user_dicts=[self.user_dict], cache_dir=self.cache_dir), loaded)
+
+    def test_load_different_dictionaries_in_sequence(self):
+        other_dict = os.path.join(self.temp_dir.name, 'other.txt')
+        with open(other_dict, 'w', encoding='utf-8') as file:
+            file.write('边缘计算节点 100 n\n')
+        tokenizer = jieba.Tokenizer()
+        load_tokenizer(tokenizer, user_dicts=[self.user_dict], cache_dir=self.cache_dir)
+        load_tokenizer(tokenizer, user_dicts=[other_dict], cache_dir=self.cache_dir)
+        self.assertEqual(tokenizer.user_word_tag_tab, {'边缘计算节点': 'n'})
+        self.assertNotIn('云计算平台', tokenizer.FREQ)
+
+        # 第二组词典的缓存中不能带上第一组的词
+        loaded = load_tokenizer(jieba.Tokenizer(), user_dicts=[other_dict], cache_dir=self.cache_dir)
+        self.assertNotIn('云计算平台', loaded.FREQ)
+        self.assertIn('边缘计算节点', loaded.FREQ)
+        self.assertEqual(loaded.total, tokenizer.total)
+
+    def test_failed_write_leaves_no_temp_file(self):
+        tokenizer = jieba.Tokenizer()
+        with mock.patch('pickle.dump', side_effect=OSError('disk full')):
+            load_tokenizer(tokenizer, user_dicts=[self.user_dict], cache_dir=self.cache_dir)
+        self.assertTrue(tokenizer.initialized)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_fingerprint_follows_dictionary_content(self):
+        tokenizer = jieba.Tokenizer()
+        before = dictionary_fingerprint(tokenizer, [self.user_dict])
+        self.assertEqual(dictionary_fingerprint(tokenizer, [self.user_dict]), before)
+        self.assertNotEqual(dictionary_fingerprint(tokenizer), before)
+        with open(self.user_dict, 'a', encoding='utf-8') as file:
+            file.write('边缘计算 100 n\n')
+        self.assertNotEqual(dictionary_fingerprint(tokenizer, [self.user_dict]), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
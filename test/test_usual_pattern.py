@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import random
+import re
+import time
+import unittest
+
+from nlpyutil.preprocess import preprocess_clean_text, preprocess_remove_links
+from nlpyutil.usual_pattern import (PATTERN_EMAIL, PATTERN_URL, Entity, extract_emails, extract_entities,
+                                    extract_entities_batch, extract_urls, mask_entities, mask_entities_batch)
+from nlpyutil.weibo import WeiboParser
+
+TEXT = '单号1538370，18554339081 详http://t.cn/Etzl0I7 邮箱abc@163.com,电话010-88886666,13800000000,+8613900000000 ' \
+       '身份证11010519491231002X'
+
+
+class ExtractEntitiesTest(unittest.TestCase):
+    def test_extract(self):
+        entities = extract_entities(TEXT)
+        self.assertEqual([(entity.kind, entity.value) for entity in entities], [
+            ('phone', '1538370'),
+            ('mobile', '18554339081'),
+            ('url', 'http://t.cn/Etzl0I7'),
+            ('email', 'abc@163.com'),
+            ('phone', '010-88886666'),
+            ('mobile', '13800000000'),
+            ('mobile', '+8613900000000'),
+            ('id_card', '11010519491231002X'),
+        ])
+        for entity in entities:
+            self.assertEqual(TEXT[entity.start:entity.end], entity.value)
+        self.assertEqual(extract_entities('没有实体'), [])
+
+    def test_kinds(self):
+        self.assertEqual(extract_entities(TEXT, kinds=['email']), [Entity('email', 45, 56, 'abc@163.com')])
+        self.assertEqual([entity.value for entity in extract_entities(TEXT, kinds=['mobile'])],
+                         ['18554339081', '13800000000', '+8613900000000'])
+        with self.assertRaises(ValueError):
+            extract_entities(TEXT, kinds=['address'])
+
+    def test_batch(self):
+        texts = [TEXT, '', 'abc@163.com']
+        self.assertEqual(extract_entities_batch(texts), [extract_entities(text) for text in texts])
+        self.assertEqual(mask_entities_batch(texts), [mask_entities(text) for text in texts])
+
+    def test_dotted_email(self):
+        self.assertEqual(extract_entities('联系 john.doe@gmail.com'), [Entity('email', 3, 21, 'john.doe@gmail.com')])
+        self.assertEqual(extract_entities('a.b+tag@x.cn,www.x.com/a@b'),
+                         [Entity('email', 0, 12, 'a.b+tag@x.cn'), Entity('url', 13, 26, 'www.x.com/a@b')])
+        self.assertEqual(mask_entities('联系 john.doe@gmail.com 或 http://x.com'), '联系 <EMAIL> 或 <URL>')
+
+    def test_mask(self):
+        self.assertEqual(mask_entities('邮箱abc@163.com,电话13800000000'), '邮箱<EMAIL>,电话<MOBILE>')
+        self.assertEqual(mask_entities('邮箱abc@163.com,电话13800000000', placeholders={'mobile': '*'}, kinds=['mobile']),
+                         '邮箱abc@163.com,电话*')
+
+
+class LinearPatternTest(unittest.TestCase):
+    def test_same_matches_as_backtracking_patterns(self):
+        # 原来的正则，去掉了链接中的空格并限制协议的层数
+        url = re.compile(r'(?:[a-zA-Z]+://){0,3}(?:[a-zA-Z_-]+(?:\.[0-9a-zA-Z]+)[a-zA-Z0-9%_@/$.&+?=-]*)')
+        email = re.compile(r'[a-zA-Z0-9_-]+@[a-zA-Z0-9_-]+(?:\.[a-zA-Z0-9_-]+)+')
+        rng = random.Random(0)
+        alphabet = ['a', 'b', '_', '-', ':', '/', '.', '1', ' ', '@', '中', '://', 'http://', 'a.b']
+        for _ in range(20000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+            self.assertEqual([m.span() for m in PATTERN_URL.finditer(text)], [m.span() for m in url.finditer(text)])
+            self.assertEqual([m.span() for m in PATTERN_EMAIL.finditer(text)],
+                             [m.span() for m in email.finditer(text)])
+
+    def test_adversarial_inputs(self):
+        n = 100000
+        texts = ['a' * n, 'a.' * (n // 2), ' ' * n, 'ab ' * (n // 3), 'a://' * (n // 4), '-_' * (n // 2),
+                 'a-' * (n // 2), 'a@' * (n // 2), 'a@a.' * (n // 4), 'a.a@' * (n // 4), 'a+' * (n // 2), '1' * n,
+                 '_http:' * (n // 6), 'x_a://' * (n // 6)]
+        parser = WeiboParser()
+        funcs = [PATTERN_URL.findall, PATTERN_EMAIL.findall, extract_urls, extract_emails, extract_entities,
+                 preprocess_remove_links, preprocess_clean_text, parser.clean]
+        for text in texts:
+            for func in funcs:
+                start = time.perf_counter()
+                func(text)
+                self.assertLess(time.perf_counter() - start, 0.5, (func, text[:10]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+import numpy as np
+
+from nlpyutil import vectorized
+from nlpyutil.preprocess import preprocess_remove_en_chars, preprocess_remove_not_chinese, preprocess_remove_symbols
+
+_TEXTS = ['今天天气★很好，we go！$100', '', 'ｆｕｌｌ　ｗｉｄｔｈ', '\ud800孤立代理', 'abc 123']
+
+
+class VectorizedTest(unittest.TestCase):
+    def test_encode_decode(self):
+        codes, offsets = vectorized.encode_batch(_TEXTS)
+        self.assertEqual(codes.dtype, np.uint32)
+        self.assertEqual(offsets.tolist()[-1], sum(len(text) for text in _TEXTS))
+        self.assertEqual(vectorized.decode_batch(codes, offsets), _TEXTS)
+
+    def test_filters(self):
+        self.assertEqual(vectorized.remove_not_chinese(_TEXTS), [preprocess_remove_not_chinese(t) for t in _TEXTS])
+        self.assertEqual(vectorized.remove_en_chars(_TEXTS), [preprocess_remove_en_chars(t) for t in _TEXTS])
+        self.assertEqual(vectorized.remove_symbols(_TEXTS), [preprocess_remove_symbols(t) for t in _TEXTS])
+
+    def test_mask_output(self):
+        mask, offsets = vectorized.remove_symbols(['a★', '$b'], output='mask')
+        self.assertEqual(mask.tolist(), [True, False, False, True])
+        self.assertEqual(offsets.tolist(), [0, 2, 4])
+        with self.assertRaises(ValueError):
+            vectorized.remove_symbols(['a'], output='json')
+
+    def test_ratio(self):
+        np.testing.assert_allclose(vectorized.cjk_ratio(['你好ab', '', 'xy']), [0.5, 0.0, 0.0])
+        np.testing.assert_allclose(vectorized.symbol_ratio(['★$ab']), [0.5])
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# MIT License
+
+# Copyright (c) 2021 Brokenwind
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import random
+import re
+import unittest
+
+from nlpyutil import usual_pattern
+from nlpyutil.preprocess import preprocess_weibo_content
+from nlpyutil.weibo import WeiboParser, WeiboPost
+
+
+def _reference(data, sentence_joint_chr='，'):
+    # 原来的 preprocess_weibo_content
+    topics = re.findall(usual_pattern.WEIBO_PATTERN_TOPIC, data)
+    topic = sentence_joint_chr.join(topics)
+    if len(topic) < 15:
+        data = re.sub(usual_pattern.PATTERN_URL, sentence_joint_chr, data)
+        if data.endswith("...全文"):
+            data = data[:len(data) - 6]
+        items = []
+        if topic:
+            items.append(topic)
+        for item in data.split("//"):
+            item = re.sub(r'@.{1,15}[:：\ ]', '', item)
+            if not item:
+                continue
+            items.append(item)
+        return sentence_joint_chr.join(items)
+    return topic
+
+
+class WeiboParserTest(unittest.TestCase):
+    def test_parse(self):
+        text = '#今日热点#转发微博 http://t.cn/A6xyz，//@新闻速递:太好了//@Tom_123：顶一下...全文'
+        post = WeiboParser().parse(text)
+        self.assertIsInstance(post, WeiboPost)
+        self.assertEqual(post.topics, ['今日热点'])
+        self.assertEqual(post.mentions, ['新闻速递', 'Tom_123'])
+        self.assertEqual(post.urls, ['http://t.cn/A6xyz'])
+        self.assertEqual(post.segments, ['#今日热点#转发微博 ，，', '太好了', '顶一'])
+        self.assertEqual(post.text, _reference(text))
+        # 话题过长时只保留话题，其它字段照常解析
+        post = WeiboParser().parse('#一个非常非常长的话题##另一个话题#正文//@someone:转发')
+        self.assertEqual(post.text, '一个非常非常长的话题，另一个话题')
+        self.assertEqual(post.mentions, ['someone'])
+
+    def test_same_as_reference(self):
+        rng = random.Random(0)
+        alphabet = ['/', '//', '@', 'a', ':', '：', ' ', '#', '哈', '.', 'http://t.cn/x', '...全文', '\n', 'b.c', '1']
+        texts = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) for _ in range(3000)]
+        texts.append('#一个非常非常长的话题##另一个话题#正文//@someone:转发')
+        for joint in ('，', '/', ''):
+            parser = WeiboParser(joint)
+            expected = [_reference(text, joint) for text in texts]
+            self.assertEqual(parser.clean_batch(texts), expected)
+            self.assertEqual([post.text for post in parser.parse_batch(texts)], expected)
+            self.assertEqual(preprocess_weibo_content(texts, sentence_joint_chr=joint), expected)
+
+    def test_pipeline_function(self):
+        parser = WeiboParser()
+        self.assertEqual(parser(''), '')
+        self.assertEqual(parser(['//@a:转发', '#话题#']), ['转发', '话题，#话题#'])
+
+
+if __name__ == '__main__':
+    unittest.main()